@@ -55,12 +55,15 @@ def api_mode_example():
     
     base_url = "http://localhost:5000"
     
+    # 复用同一个会话，保持与API服务器的长连接
+    session = requests.Session()
+    
     def call_api(endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """调用API并返回JSON响应"""
         if data:
-            response = requests.post(f"{base_url}{endpoint}", json=data)
+            response = session.post(f"{base_url}{endpoint}", json=data)
         else:
-            response = requests.get(f"{base_url}{endpoint}")
+            response = session.get(f"{base_url}{endpoint}")
         response.raise_for_status()
         return response.json()
     
@@ -76,7 +79,8 @@ def api_mode_example():
             "url": "https://example.com",
             "options": {
                 "browser": DEFAULT_BROWSER,
-                "headless": True
+                "headless": True,
+                "max_content_bytes": 200
             }
         })
         print(f"提取结果: {json.dumps(result, indent=2)}")
@@ -110,6 +114,8 @@ def api_mode_example():
     except requests.exceptions.RequestException as e:
         print(f"API调用失败: {e}")
         print("请确保API服务器正在运行（python src/main.py server）")
+    finally:
+        session.close()
 
 def main():
     """主函数"""
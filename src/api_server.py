@@ -3,63 +3,318 @@ API服务器模块
 提供RESTful API接口，用于网页内容爬取
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import atexit
 import logging
+import re
+import threading
 import time
-from flask import Flask, request, jsonify, Response
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields
+from urllib.parse import urlsplit
+from flask import Flask, request, jsonify, json, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from selenium.common.exceptions import JavascriptException
+from werkzeug.exceptions import HTTPException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 导入配置
 from config import (
     API_HOST, 
     API_PORT, 
     API_DEBUG, 
+    API_THREADS,
     DEFAULT_BROWSER, 
-    HEADLESS_MODE
+    HEADLESS_MODE,
+    BATCH_MAX_WORKERS,
+    BATCH_PER_HOST_CONCURRENCY,
+    MAX_CONCURRENT_CRAWLS,
+    CRAWLER_POOL_WARMUP,
+    CRAWLER_IDLE_TIMEOUT,
+    get_error_message
 )
+from crawler_pool import CrawlerPool, PoolExhaustedError
+from result_cache import ResultCache
 
 # 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """使用orjson进行JSON编解码的Flask JSON提供者"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 # 创建Flask应用
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)  # orjson可用时替换默认的JSON编解码
 CORS(app)  # 启用CORS支持
 
-# 全局爬虫实例池
-crawler_pool = {}
-
 # 使用延迟导入避免循环依赖
 def get_crawler_class():
     """获取WebCrawler类，使用延迟导入避免循环依赖"""
     from crawler import WebCrawler
     return WebCrawler
 
+def _create_crawler():
+    """创建未设置的WebCrawler实例，供爬虫实例池使用"""
+    return get_crawler_class()()
+
+# 全局爬虫实例池
+crawler_pool = CrawlerPool(_create_crawler)
+atexit.register(crawler_pool.close_all)
+
+# 最近爬取结果的缓存
+result_cache = ResultCache()
+
+# 批量爬取共用的线程池，限制整个进程内同时进行的爬取线程数
+crawl_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CRAWLS, thread_name_prefix="crawl")
+atexit.register(crawl_executor.shutdown, wait=False)
+
+@dataclass
+class CrawlOptions:
+    """请求中的爬取选项，未提供的字段使用配置默认值"""
+    browser: str = DEFAULT_BROWSER
+    headless: bool = HEADLESS_MODE
+    handle_pagination: bool = True
+    max_content_bytes: Optional[int] = None
+    fields: Optional[List[str]] = None
+
+_OPTION_FIELDS = frozenset(f.name for f in fields(CrawlOptions))
+_BROWSERS = ("chrome", "firefox")
+
+# 只接受带主机名的 http/https URL
+_URL_RE = re.compile(r'^https?://[^/\s?#]+', re.ASCII | re.IGNORECASE)
+
+def _is_valid_url(url: Any) -> bool:
+    """检查URL是否为带主机名的 http/https 地址"""
+    return isinstance(url, str) and _URL_RE.match(url) is not None
+
+class RequestError(Exception):
+    """请求数据无效"""
+    
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def _error_response(message: str, status_code: int):
+    """构造统一格式的错误响应"""
+    return jsonify({
+        "status": "error",
+        "message": message
+    }), status_code
+
+def _parse_request(key: str) -> Tuple[Dict[str, Any], Any, CrawlOptions]:
+    """
+    解析并校验请求体，在获取爬虫实例之前完成
+    
+    Args:
+        key: 必需的字段名，"url" 要求为字符串，"urls" 要求为非空列表
+        
+    Returns:
+        Tuple: (请求数据, 字段值, 爬取选项)
+        
+    Raises:
+        RequestError: 请求数据无效
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        raise RequestError("无效的请求数据，需要JSON格式")
+    
+    value = data.get(key)
+    if key == "urls":
+        if not value or not isinstance(value, list):
+            raise RequestError("请求中未提供有效的URL列表")
+        # 批量请求中无效的URL与爬取失败的URL一样不出现在结果中
+        value = [url for url in value if _is_valid_url(url)]
+        if not value:
+            raise RequestError("请求中未提供有效的URL列表")
+    elif not value or not isinstance(value, str):
+        raise RequestError("请求中未提供有效的URL")
+    elif not _is_valid_url(value):
+        raise RequestError(get_error_message("invalid_url", url=value))
+    
+    selector = data.get("selector", "body")
+    if not isinstance(selector, str) or not selector.strip():
+        raise RequestError("selector 必须是非空字符串")
+    
+    options = data.get("options") or {}
+    if not isinstance(options, dict):
+        raise RequestError("options 必须是JSON对象")
+    
+    crawl_options = CrawlOptions(**{k: options[k] for k in options.keys() & _OPTION_FIELDS})
+    if not isinstance(crawl_options.browser, str) or crawl_options.browser.lower() not in _BROWSERS:
+        raise RequestError(f"browser 必须是以下之一: {', '.join(_BROWSERS)}")
+    crawl_options.browser = crawl_options.browser.lower()
+    for name in ("headless", "handle_pagination"):
+        if not isinstance(getattr(crawl_options, name), bool):
+            raise RequestError(f"{name} 必须是布尔值")
+    max_bytes = crawl_options.max_content_bytes
+    if max_bytes is not None and (not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 0):
+        raise RequestError("max_content_bytes 必须是非负整数")
+    if crawl_options.fields is not None and (
+            not isinstance(crawl_options.fields, list)
+            or not all(isinstance(f, str) for f in crawl_options.fields)):
+        raise RequestError("fields 必须是字符串列表")
+    
+    return data, value, crawl_options
+
+def _shape_result(result: Dict[str, Any], options: CrawlOptions) -> Dict[str, Any]:
+    """
+    按请求选项裁剪单条爬取结果，返回新字典（缓存中的结果不会被修改）
+    
+    - max_content_bytes: 将 content 截断到指定的UTF-8字节数
+    - fields: 只保留指定字段（始终保留 url）
+    """
+    shaped = dict(result)
+    content = shaped.get("content")
+    if options.max_content_bytes is not None and isinstance(content, str):
+        shaped["content"] = content.encode("utf-8")[:options.max_content_bytes].decode("utf-8", "ignore")
+    if options.fields is not None:
+        shaped = {k: v for k, v in shaped.items() if k == "url" or k in options.fields}
+    return shaped
+
+def _bypass_cache() -> bool:
+    """请求头 Cache-Control 包含 no-cache 时跳过结果缓存"""
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+@app.errorhandler(RequestError)
+def handle_request_error(e: RequestError):
+    """请求数据无效"""
+    return _error_response(e.message, e.status_code)
+
+@app.errorhandler(PoolExhaustedError)
+def handle_pool_exhausted(e: PoolExhaustedError):
+    """爬虫实例池已满"""
+    logger.warning("爬虫实例池已满: %s", e)
+    return _error_response(f"服务器繁忙，请稍后重试: {str(e)}", 503)
+
+@app.errorhandler(Exception)
+def handle_unexpected_error(e: Exception):
+    """未处理的异常统一返回500，HTTP异常（如404/405）保持原样"""
+    if isinstance(e, HTTPException):
+        return e
+    logger.exception("处理请求 %s 时发生异常: %s", request.path, e)
+    return _error_response(f"服务器内部错误: {str(e)}", 500)
+
+def crawl_urls_parallel(urls: List[str], browser_type: str, headless: bool,
+                        handle_pagination: bool = True, use_cache: bool = True) -> List[Dict[str, Any]]:
+    """
+    使用实例池中的多个爬虫并行爬取URL列表
+    
+    每个工作线程占用一个爬虫实例，依次领取待爬取的URL；同一主机同时最多有
+    BATCH_PER_HOST_CONCURRENCY 个URL在爬取，避免批量请求集中压垮单个站点。
+    返回结果保持输入URL的顺序，爬取失败的URL不出现在结果中。
+    
+    Args:
+        urls: 要爬取的URL列表
+        browser_type: 浏览器类型
+        headless: 是否使用无头模式
+        handle_pagination: 是否处理分页内容
+        use_cache: 是否使用结果缓存中的未过期结果（新爬取的结果总会写入缓存）
+        
+    Returns:
+        List[Dict[str, Any]]: 爬取结果列表
+    """
+    indexed: List[Tuple[int, Dict[str, Any]]] = []
+    pending = []
+    for index, url in enumerate(urls):
+        cached = result_cache.get((url, browser_type, headless, handle_pagination)) if use_cache else None
+        if cached is not None:
+            indexed.append((index, cached))
+        else:
+            pending.append((index, url, urlsplit(url).netloc))
+    
+    if not pending:
+        return [result for _, result in indexed]
+    
+    host_count = len({host for _, _, host in pending})
+    workers = min(len(pending), BATCH_MAX_WORKERS, host_count * BATCH_PER_HOST_CONCURRENCY)
+    
+    active_hosts: Dict[str, int] = defaultdict(int)
+    condition = threading.Condition()
+    
+    def next_url():
+        """领取下一个所在主机未达并发上限的URL，全部领取完毕时返回None"""
+        with condition:
+            while pending:
+                for position, (index, url, host) in enumerate(pending):
+                    if active_hosts[host] < BATCH_PER_HOST_CONCURRENCY:
+                        active_hosts[host] += 1
+                        del pending[position]
+                        return index, url, host
+                condition.wait()
+            return None
+    
+    def release_host(host):
+        with condition:
+            active_hosts[host] -= 1
+            condition.notify_all()
+    
+    def worker():
+        with crawler_pool.lease(browser_type, headless) as crawler:
+            while True:
+                item = next_url()
+                if item is None:
+                    return
+                index, url, host = item
+                try:
+                    for result in crawler.crawl_urls([url], handle_pagination=handle_pagination):
+                        result_cache.set((url, browser_type, headless, handle_pagination), result)
+                        indexed.append((index, result))
+                finally:
+                    release_host(host)
+    
+    futures = [crawl_executor.submit(worker) for _ in range(workers)]
+    wait(futures)
+    
+    # 只要有一个工作线程拿到爬虫实例，所有URL都会被处理；全部拿不到时才视为池已满
+    exhausted = [f.exception() for f in futures if isinstance(f.exception(), PoolExhaustedError)]
+    if len(exhausted) == workers:
+        raise exhausted[0]
+    for future in futures:
+        if future.exception() is not None and not isinstance(future.exception(), PoolExhaustedError):
+            raise future.exception()
+    
+    indexed.sort(key=lambda pair: pair[0])
+    return [result for _, result in indexed]
+
+# 根路径的响应内容固定不变，启动时编码一次
+_INDEX_BODY = app.json.dumps({
+    "name": "Selenium Web Crawler API",
+    "version": "1.0.0",
+    "endpoints": [
+        {"path": "/api/extract", "method": "POST", "description": "提取URL内容"},
+        {"path": "/api/extract-text", "method": "POST", "description": "提取URL文本内容"},
+        {"path": "/api/batch", "method": "POST", "description": "批量提取多个URL内容"},
+        {"path": "/api/status", "method": "GET", "description": "获取API服务器状态"}
+    ]
+})
+
 @app.route("/", methods=["GET"])
 def index() -> Response:
     """API服务器根路径处理器"""
-    return jsonify({
-        "name": "Selenium Web Crawler API",
-        "version": "1.0.0",
-        "endpoints": [
-            {"path": "/api/extract", "method": "POST", "description": "提取URL内容"},
-            {"path": "/api/extract-text", "method": "POST", "description": "提取URL文本内容"},
-            {"path": "/api/batch", "method": "POST", "description": "批量提取多个URL内容"},
-            {"path": "/api/status", "method": "GET", "description": "获取API服务器状态"}
-        ]
-    })
+    return Response(_INDEX_BODY, mimetype="application/json")
 
 @app.route("/api/status", methods=["GET"])
 def get_status() -> Response:
-    """获取API服务器状态"""
-    return jsonify({
-        "status": "running",
-        "active_crawlers": len(crawler_pool),
-        "uptime": time.time() - app.start_time if hasattr(app, 'start_time') else 0
-    })
+    """获取API服务器状态（常被健康检查频繁调用，直接拼接JSON）"""
+    uptime = time.time() - app.start_time if hasattr(app, 'start_time') else 0
+    return Response(
+        f'{{"status":"running","active_crawlers":{crawler_pool.active},"uptime":{uptime}}}',
+        mimetype="application/json"
+    )
 
 @app.route("/api/extract", methods=["POST"])
 def extract_content() -> Response:
@@ -75,7 +330,8 @@ def extract_content() -> Response:
         "options": {                   # 可选，爬取选项
             "browser": "chrome",       # 可选，浏览器类型：chrome或firefox
             "headless": true,          # 可选，是否使用无头模式
-            "handle_pagination": true  # 可选，是否处理分页内容
+            "handle_pagination": true, # 可选，是否处理分页内容
+            "max_content_bytes": 1024  # 可选，content 最多返回的字节数
         }
     }
     
@@ -96,68 +352,30 @@ def extract_content() -> Response:
     Returns:
         Response: 包含提取内容或错误信息的JSON响应
     """
-    crawler = None
-    try:
-        # 解析请求数据
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                "status": "error",
-                "message": "无效的请求数据，需要JSON格式"
-            }), 400
-        
-        # 获取URL
-        url = data.get("url")
-        if not url or not isinstance(url, str):
-            return jsonify({
-                "status": "error",
-                "message": "请求中未提供有效的URL"
-            }), 400
-        
-        # 获取选项
-        options = data.get("options", {})
-        browser_type = options.get("browser", DEFAULT_BROWSER)
-        headless = options.get("headless", HEADLESS_MODE)
-        handle_pagination = options.get("handle_pagination", True)
-        
-        # 创建爬虫实例
-        WebCrawler = get_crawler_class()
-        crawler = WebCrawler()
-        
-        # 设置爬虫
-        crawler.setup(
-            browser_type=browser_type,
-            headless=headless
-        )
+    _, url, options = _parse_request("url")
+    
+    # 优先使用缓存的结果，请求头要求 no-cache 时重新爬取
+    cache_key = (url, options.browser, options.headless, options.handle_pagination)
+    result = None if _bypass_cache() else result_cache.get(cache_key)
+    
+    if result is None:
+        # 从实例池获取爬虫并执行爬取
+        with crawler_pool.lease(options.browser, options.headless) as crawler:
+            results = crawler.crawl_urls([url], handle_pagination=options.handle_pagination)
         
-        # 执行爬取
-        results = crawler.crawl_urls([url], handle_pagination=handle_pagination)
+        if not results:
+            return _error_response("未能提取到页面内容", 404)
         
-        if results and len(results) > 0:
-            result = results[0]
-            return jsonify({
-                "status": "success",
-                "url": url,
-                "title": result.get("title", ""),
-                "content": result.get("content", "")
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "未能提取到页面内容"
-            }), 404
-            
-    except Exception as e:
-        logger.exception(f"提取内容时发生异常: {str(e)}")
-        return jsonify({
-            "status": "error",
-            "message": f"服务器内部错误: {str(e)}"
-        }), 500
-    finally:
-        # 清理资源
-        if crawler:
-            crawler.cleanup()
+        result = results[0]
+        result_cache.set(cache_key, result)
+    
+    result = _shape_result(result, options)
+    return jsonify({
+        "status": "success",
+        "url": url,
+        "title": result.get("title", ""),
+        "content": result.get("content", "")
+    })
 
 @app.route("/api/extract-text", methods=["POST"])
 def extract_text_content() -> Response:
@@ -180,71 +398,29 @@ def extract_text_content() -> Response:
     Returns:
         Response: 包含提取文本内容或错误信息的JSON响应
     """
-    crawler = None
-    try:
-        # 解析请求数据
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                "status": "error",
-                "message": "无效的请求数据，需要JSON格式"
-            }), 400
-        
-        # 获取URL
-        url = data.get("url")
-        if not url or not isinstance(url, str):
-            return jsonify({
-                "status": "error",
-                "message": "请求中未提供有效的URL"
-            }), 400
-        
-        # 获取选择器
-        selector = data.get("selector", "body")
-        
-        # 获取选项
-        options = data.get("options", {})
-        browser_type = options.get("browser", DEFAULT_BROWSER)
-        headless = options.get("headless", HEADLESS_MODE)
-        
-        # 创建爬虫实例
-        crawler = WebCrawler()
-        
-        # 设置爬虫
-        crawler.setup(
-            browser_type=browser_type,
-            headless=headless
-        )
-        
+    data, url, options = _parse_request("url")
+    selector = data.get("selector", "body")
+    
+    # 从实例池获取爬虫
+    with crawler_pool.lease(options.browser, options.headless) as crawler:
         # 访问页面
         results = crawler.crawl_urls([url])
         
-        if not results or len(results) == 0:
-            return jsonify({
-                "status": "error",
-                "message": "未能访问页面"
-            }), 404
+        if not results:
+            return _error_response("未能访问页面", 404)
         
-        # 提取文本内容
-        text_content = crawler.extract_text_content(selector)
-        
-        return jsonify({
-            "status": "success",
-            "url": url,
-            "title": results[0].get("title", ""),
-            "text_content": text_content
-        })
-            
-    except Exception as e:
-        logger.exception(f"提取文本内容时发生异常: {str(e)}")
-        return jsonify({
-            "status": "error",
-            "message": f"服务器内部错误: {str(e)}"
-        }), 500
-    finally:
-        # 清理资源
-        if crawler:
-            crawler.cleanup()
+        # 提取文本内容；选择器语法错误不影响浏览器会话，实例照常归还池中
+        try:
+            text_content = crawler.extract_text_content(selector)
+        except JavascriptException:
+            return _error_response(f"无效的CSS选择器: {selector}", 400)
+    
+    return jsonify({
+        "status": "success",
+        "url": url,
+        "title": results[0].get("title", ""),
+        "text_content": text_content
+    })
 
 @app.route("/api/batch", methods=["POST"])
 def batch_extract() -> Response:
@@ -260,66 +436,38 @@ def batch_extract() -> Response:
         "options": {                   # 可选，爬取选项
             "browser": "chrome",       # 可选，浏览器类型：chrome或firefox
             "headless": true,          # 可选，是否使用无头模式
-            "handle_pagination": true  # 可选，是否处理分页内容
+            "handle_pagination": true, # 可选，是否处理分页内容
+            "max_content_bytes": 1024, # 可选，每条结果的 content 最多返回的字节数
+            "fields": ["title"]        # 可选，只返回指定字段（url 始终返回）
         }
     }
     
     Returns:
         Response: 包含提取内容或错误信息的JSON响应
     """
-    crawler = None
-    try:
-        # 解析请求数据
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                "status": "error",
-                "message": "无效的请求数据，需要JSON格式"
-            }), 400
-        
-        # 获取URL列表
-        urls = data.get("urls")
-        if not urls or not isinstance(urls, list) or len(urls) == 0:
-            return jsonify({
-                "status": "error",
-                "message": "请求中未提供有效的URL列表"
-            }), 400
-        
-        # 获取选项
-        options = data.get("options", {})
-        browser_type = options.get("browser", DEFAULT_BROWSER)
-        headless = options.get("headless", HEADLESS_MODE)
-        handle_pagination = options.get("handle_pagination", True)
-        
-        # 创建爬虫实例
-        crawler = WebCrawler()
-        
-        # 设置爬虫
-        crawler.setup(
-            browser_type=browser_type,
-            headless=headless
-        )
-        
-        # 执行爬取
-        results = crawler.crawl_urls(urls, handle_pagination=handle_pagination)
-        
-        return jsonify({
-            "status": "success",
-            "count": len(results),
-            "results": results
-        })
-            
-    except Exception as e:
-        logger.exception(f"批量提取内容时发生异常: {str(e)}")
-        return jsonify({
-            "status": "error",
-            "message": f"服务器内部错误: {str(e)}"
-        }), 500
-    finally:
-        # 清理资源
-        if crawler:
-            crawler.cleanup()
+    _, urls, options = _parse_request("urls")
+    
+    # 使用实例池中的多个爬虫并行爬取
+    results = crawl_urls_parallel(urls, options.browser, options.headless, options.handle_pagination,
+                                  use_cache=not _bypass_cache())
+    
+    # 逐条序列化结果并流式返回，避免把所有页面内容一次性编码到同一个缓冲区
+    def generate():
+        yield f'{{"status":"success","count":{len(results)},"results":['
+        for index, result in enumerate(results):
+            yield ("," if index else "") + json.dumps(_shape_result(result, options))
+        yield "]}"
+    
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+def _configure_logging():
+    """配置根日志记录器，已有处理器（如入口脚本已配置）时不重复配置"""
+    if logging.getLogger().handlers:
+        return
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 
 def start_api_server(host=API_HOST, port=API_PORT, debug=API_DEBUG):
     """
@@ -330,6 +478,27 @@ def start_api_server(host=API_HOST, port=API_PORT, debug=API_DEBUG):
         port: 服务器端口
         debug: 是否启用调试模式
     """
-    logger.info(f"启动API服务器 - 监听 {host}:{port}")
+    _configure_logging()
+    
+    if CRAWLER_POOL_WARMUP > 0:
+        warmed = crawler_pool.warm_up(DEFAULT_BROWSER, HEADLESS_MODE, CRAWLER_POOL_WARMUP)
+        logger.info("爬虫实例池预热完成: %d 个实例", warmed)
+    
+    if CRAWLER_IDLE_TIMEOUT > 0:
+        crawler_pool.start_janitor(CRAWLER_IDLE_TIMEOUT)
+    
+    logger.info("启动API服务器 - 监听 %s:%s", host, port)
     app.start_time = time.time()
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    
+    if debug:
+        app.run(host=host, port=port, debug=True)
+        return
+    
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("未安装waitress，使用Flask内置服务器")
+        app.run(host=host, port=port, threaded=True)
+        return
+    
+    serve(app, host=host, port=port, threads=API_THREADS)
\ No newline at end of file
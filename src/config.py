@@ -9,6 +9,7 @@ from typing import Dict, Any
 # WebDriver配置
 USE_REMOTE_WEBDRIVER = os.getenv('USE_REMOTE_WEBDRIVER', 'true').lower() == 'true'
 REMOTE_WEBDRIVER_URL = os.getenv('REMOTE_WEBDRIVER_URL', 'http://172.16.101.252:4444/wd/hub')
+REMOTE_POOL_MAXSIZE = int(os.getenv('REMOTE_POOL_MAXSIZE', '20'))
 
 # 浏览器配置
 DEFAULT_BROWSER = os.getenv('SELENIUM_BROWSER', 'chrome')
@@ -20,6 +21,9 @@ PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
 PAGE_WAIT_TIMEOUT = int(os.getenv('PAGE_WAIT_TIMEOUT', '10'))
 ELEMENT_WAIT_TIMEOUT = int(os.getenv('ELEMENT_WAIT_TIMEOUT', '10'))
 
+# 浏览器会话访问指定数量的页面后重建，避免浏览器内存持续增长，0 表示不重建
+DRIVER_RECYCLE_EVERY = int(os.getenv('DRIVER_RECYCLE_EVERY', '100'))
+
 # 重试配置
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
 RETRY_DELAY = int(os.getenv('RETRY_DELAY', '2'))
@@ -28,6 +32,21 @@ RETRY_DELAY = int(os.getenv('RETRY_DELAY', '2'))
 API_HOST = os.getenv('API_HOST', '0.0.0.0')
 API_PORT = int(os.getenv('API_PORT', '5000'))
 API_DEBUG = os.getenv('API_DEBUG', 'false').lower() == 'true'
+API_THREADS = int(os.getenv('API_THREADS', '16'))
+
+# 爬虫实例池配置
+CRAWLER_POOL_SIZE = int(os.getenv('CRAWLER_POOL_SIZE', '4'))
+CRAWLER_POOL_TIMEOUT = int(os.getenv('CRAWLER_POOL_TIMEOUT', '30'))
+CRAWLER_POOL_WARMUP = int(os.getenv('CRAWLER_POOL_WARMUP', '0'))
+CRAWLER_IDLE_TIMEOUT = int(os.getenv('CRAWLER_IDLE_TIMEOUT', '300'))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '4'))
+BATCH_PER_HOST_CONCURRENCY = int(os.getenv('BATCH_PER_HOST_CONCURRENCY', '2'))
+MAX_CONCURRENT_CRAWLS = int(os.getenv('MAX_CONCURRENT_CRAWLS', '8'))
+
+# 爬取结果缓存配置
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '512'))
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '300'))
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
 
 # 浏览器驱动配置
 CHROME_DRIVER_PATH = os.getenv('CHROME_DRIVER_PATH', '')
@@ -80,6 +99,17 @@ BROWSER_OPTIONS: Dict[str, Dict[str, Any]] = {
 PAGE_LOAD_STRATEGY = 'normal'  # 可选：'normal', 'eager', 'none'
 SCROLL_PAUSE_TIME = 1.0  # 滚动页面时的暂停时间（秒）
 SCROLL_ATTEMPTS = 5  # 滚动尝试次数
+# 通过CDP Page.navigate 导航，DOM可交互即返回（仅本地Chrome）
+FAST_NAVIGATION = os.getenv('FAST_NAVIGATION', 'false').lower() == 'true'
+
+# 资源拦截配置：只需要DOM内容，不下载图片、字体、音视频和统计脚本
+BLOCK_MEDIA_RESOURCES = os.getenv('BLOCK_MEDIA_RESOURCES', 'true').lower() == 'true'
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3',
+    '*googletagmanager*', '*google-analytics*'
+]
 
 # 分页配置
 PAGINATION_SELECTORS = [
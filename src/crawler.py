@@ -5,14 +5,16 @@
 """
 
 import sys
+import logging
 import argparse
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from config import DEFAULT_BROWSER, HEADLESS_MODE, PAGE_WAIT_TIMEOUT, FAST_NAVIGATION, DRIVER_RECYCLE_EVERY
 from driver_manager import get_driver
-from api_server import start_api_server
+
+# 设置日志
+logger = logging.getLogger(__name__)
 
 class WebCrawler:
     """网页内容爬取类"""
@@ -20,8 +22,13 @@ class WebCrawler:
     def __init__(self):
         """初始化爬虫"""
         self.driver = None
-        self.browser_type = None
-        self.headless = True
+        self.wait = None
+        self.pages_visited = 0
+        self.visited_origins = set()
+        self.driver_options = {}
+        # setup 之前使用配置中的默认值，setup 时再替换为实际使用的值
+        self.browser_type = DEFAULT_BROWSER
+        self.headless = HEADLESS_MODE
     
     def __enter__(self):
         """上下文管理器入口方法"""
@@ -32,25 +39,73 @@ class WebCrawler:
         self.cleanup()
         return False  # 不抑制异常
     
-    def setup(self, browser_type="chrome", headless=True):
-        """设置爬虫参数"""
+    def setup(self, browser_type="chrome", headless=True, extra_arguments=None, extra_prefs=None,
+              page_load_strategy=None):
+        """
+        设置爬虫参数并启动浏览器
+        
+        Args:
+            browser_type: 浏览器类型
+            headless: 是否使用无头模式
+            extra_arguments: 额外的Chrome启动参数
+            extra_prefs: 额外的Chrome偏好设置
+            page_load_strategy: 页面加载策略（normal/eager/none），默认由驱动配置决定
+        """
         self.browser_type = browser_type
         self.headless = headless
+        # 保存驱动选项，重建浏览器会话时沿用
+        self.driver_options = {
+            "extra_arguments": extra_arguments,
+            "extra_prefs": extra_prefs,
+            "page_load_strategy": page_load_strategy
+        }
         
         # 获取WebDriver实例
+        self.pages_visited = 0
+        self.visited_origins = set()
         self.driver = get_driver(
             browser_type=browser_type,
-            headless=headless
+            headless=headless,
+            **self.driver_options
         )
+        # 同一会话内复用的显式等待
+        self.wait = WebDriverWait(self.driver, PAGE_WAIT_TIMEOUT, poll_frequency=0.2)
+    
+    def wait_for(self, condition):
+        """
+        显式等待条件成立
+        
+        Args:
+            condition: expected_conditions 中的条件或接收driver的可调用对象
+            
+        Returns:
+            条件返回的值
+            
+        Raises:
+            TimeoutException: 超过 PAGE_WAIT_TIMEOUT 秒条件仍未成立
+        """
+        return self.wait.until(condition)
     
     def crawl_urls(self, urls, handle_pagination=True):
-        """爬取指定URL列表"""
-        results = []
+        """爬取指定URL列表，返回结果列表"""
+        return list(self.iter_crawl(urls, handle_pagination=handle_pagination))
+    
+    def iter_crawl(self, urls, handle_pagination=True):
+        """
+        逐个爬取URL并立即产出结果
         
+        调用方处理完一条结果后即可释放其页面内容，不必把所有页面同时保留在内存中
+        """
         for url in urls:
+            # 重建会话失败时直接抛出，不再用已关闭的驱动继续访问剩余URL
+            self._recycle_if_needed()
+            
             try:
                 # 访问页面
-                self.driver.get(url)
+                self.navigate(url)
+                
+                # 记录重定向后的实际来源，重置状态时一并清理
+                self._record_origin(self.driver.current_url)
                 
                 # 获取页面内容
                 content = self.driver.page_source
@@ -62,20 +117,123 @@ class WebCrawler:
                     'content': content
                 }
                 
-                results.append(result)
-                
-                print(f"成功爬取: {url}")
-                print(f"页面标题: {result['title']}")
+                logger.info("成功爬取: %s (页面标题: %s)", url, result['title'])
                 
             except Exception as e:
-                print(f"爬取 {url} 失败: {str(e)}")
+                logger.error("爬取 %s 失败: %s", url, e)
+                continue
+            
+            yield result
+    
+    def _recycle_if_needed(self):
+        """访问页面数达到 DRIVER_RECYCLE_EVERY 时关闭并重建浏览器会话，释放浏览器累积的内存"""
+        if DRIVER_RECYCLE_EVERY <= 0 or self.pages_visited < DRIVER_RECYCLE_EVERY:
+            return
+        logger.info("已访问 %d 个页面，重建浏览器会话", self.pages_visited)
+        self.cleanup()
+        self.setup(browser_type=self.browser_type, headless=self.headless, **self.driver_options)
+    
+    def _record_origin(self, url):
+        """记录访问过的来源（scheme://host），用于重置会话状态"""
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https") and parts.netloc:
+            self.visited_origins.add(f"{parts.scheme}://{parts.netloc}")
+    
+    def _supports_cdp(self):
+        """
+        判断当前会话能否执行CDP命令
+        
+        Firefox 驱动同样带有 execute_cdp_cmd 方法，但调用时会抛出 RuntimeError，因此按浏览器类型判断
+        """
+        return (self.browser_type or "").lower() == "chrome"
+    
+    def navigate(self, url):
+        """
+        打开指定URL
+        
+        启用 FAST_NAVIGATION 且为Chrome会话时，通过 Page.navigate 发起导航，新文档可交互即返回；
+        否则或CDP导航失败时使用 driver.get
+        """
+        self.pages_visited += 1
+        self._record_origin(url)
+        if FAST_NAVIGATION and self._supports_cdp():
+            try:
+                # 给旧文档打标记，新文档中没有该标记，避免把旧页面的 readyState 当成导航完成
+                self.driver.execute_script("window.__crawlerStale = true;")
+                response = self.driver.execute_cdp_cmd("Page.navigate", {"url": url})
+                if not response.get("errorText"):
+                    self.wait_for(lambda d: d.execute_script(
+                        "return !window.__crawlerStale && document.readyState !== 'loading';"
+                    ))
+                    return
+            except Exception as e:
+                # 驱动不支持CDP时可能抛出 RuntimeError 等非 WebDriverException 异常
+                logger.debug("CDP导航失败，改用 driver.get: %s", e)
+        self.driver.get(url)
+    
+    def extract_text_content(self, selector="body"):
+        """
+        提取当前页面中匹配选择器的所有元素的可见文本
         
-        return results
+        在浏览器内一次脚本调用完成查询和拼接，避免逐个元素往返读取文本
+        
+        Args:
+            selector: CSS选择器
+            
+        Returns:
+            str: 各元素文本以换行连接后的字符串，没有匹配元素时为空字符串
+        """
+        return self.driver.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]))"
+            ".map(function (e) { return e.innerText; }).join('\\n');",
+            selector
+        )
+    
+    def is_alive(self):
+        """通过读取页面标题探测浏览器会话是否仍然可用"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.title
+            return True
+        except WebDriverException:
+            return False
+    
+    def reset_state(self):
+        """
+        清除会话状态（cookie、本地存储）并回到空白页，便于实例被下一个任务复用
+        
+        Chrome 会话通过CDP清除所有cookie及访问过的每个来源的存储；其他浏览器中
+        delete_all_cookies 和脚本只能清理当前页面所在的来源，访问过多个来源时直接重建浏览器会话
+        """
+        if not self.driver:
+            return
+        if self._supports_cdp():
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in self.visited_origins:
+                self.driver.execute_cdp_cmd(
+                    "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": "all"}
+                )
+        elif len(self.visited_origins) > 1:
+            logger.info("会话访问过 %d 个来源，重建浏览器会话以清除状态", len(self.visited_origins))
+            self.cleanup()
+            self.setup(browser_type=self.browser_type, headless=self.headless, **self.driver_options)
+            return
+        else:
+            self.driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+        self.visited_origins.clear()
     
     def cleanup(self):
         """清理资源"""
         if self.driver:
             self.driver.quit()
+            self.driver = None
+            self.wait = None
 
 def parse_args() -> argparse.Namespace:
     """解析命令行参数"""
@@ -130,6 +288,10 @@ def parse_args() -> argparse.Namespace:
 
 def run_cli_mode(args):
     """运行命令行模式"""
+    # 爬取进度通过日志输出（仅在尚未配置时）
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     try:
         # 创建爬虫实例
         crawler = WebCrawler()
@@ -141,11 +303,12 @@ def run_cli_mode(args):
         )
         
         try:
-            # 执行爬取
-            crawler.crawl_urls(
+            # 执行爬取，结果在爬取过程中已输出，无需保留页面内容
+            for _ in crawler.iter_crawl(
                 args.urls,
                 handle_pagination=not args.no_pagination
-            )
+            ):
+                pass
         finally:
             # 清理资源
             crawler.cleanup()
@@ -163,7 +326,8 @@ if __name__ == "__main__":
     args = parse_args()
     
     if args.mode == "api":
-        # API服务器模式
+        # API服务器模式（仅在需要时导入Flask相关模块）
+        from api_server import start_api_server
         start_api_server(
             host=args.host,
             port=args.port,
@@ -0,0 +1,262 @@
+"""
+爬虫实例池模块
+按 (browser_type, headless) 分组复用已启动的 WebCrawler，避免每个请求都重新启动浏览器
+"""
+
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+# 导入配置
+from config import CRAWLER_POOL_SIZE, CRAWLER_POOL_TIMEOUT
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, bool]
+
+class PoolExhaustedError(Exception):
+    """在超时时间内未能从池中获取到可用的爬虫实例"""
+
+class CrawlerPool:
+    """WebCrawler 实例池"""
+
+    def __init__(self, factory: Callable[[], Any], size: int = CRAWLER_POOL_SIZE,
+                 timeout: float = CRAWLER_POOL_TIMEOUT):
+        """
+        初始化实例池
+
+        Args:
+            factory: 创建未设置的 WebCrawler 实例的可调用对象
+            size: 池中同时存在的爬虫实例上限（所有分组合计）
+            timeout: 获取实例时的最长等待时间（秒）
+        """
+        self._factory = factory
+        self._size = size
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        # 有实例归还或名额释放时唤醒等待者；等待者通过代数判断等待期间是否有变化，避免错过通知
+        self._changed = threading.Condition(self._lock)
+        self._generation = 0
+        self._idle: Dict[PoolKey, queue.Queue] = {}
+        self._created = 0
+
+    @property
+    def active(self) -> int:
+        """当前已创建（空闲+使用中）的爬虫实例数量"""
+        return self._created
+
+    def _idle_queue(self, key: PoolKey) -> queue.Queue:
+        """获取指定分组的空闲队列"""
+        with self._lock:
+            return self._idle.setdefault(key, queue.Queue())
+
+    def _reserve_slot(self, key: PoolKey) -> bool:
+        """
+        为新实例预留名额
+
+        池已满时尝试淘汰其他分组中的一个空闲实例来腾出名额
+        """
+        victim = None
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                return True
+            for other_key, idle in self._idle.items():
+                if other_key == key:
+                    continue
+                try:
+                    victim = idle.get_nowait()[1]
+                    break
+                except queue.Empty:
+                    continue
+        if victim is None:
+            return False
+        # 名额直接转交给新实例，计数保持不变
+        self._close(victim)
+        return True
+
+    def _notify_locked(self) -> None:
+        """在持有锁时通知等待者池状态已变化"""
+        self._generation += 1
+        self._changed.notify_all()
+
+    def _free_slot(self) -> None:
+        """释放一个实例名额并唤醒等待者"""
+        with self._lock:
+            self._created -= 1
+            self._notify_locked()
+
+    def _close(self, crawler: Any) -> None:
+        """关闭爬虫实例，忽略清理过程中的异常"""
+        try:
+            crawler.cleanup()
+        except Exception as e:
+            logger.warning("清理爬虫实例失败: %s", e)
+
+    def _take_idle(self, idle: queue.Queue) -> Any:
+        """取出一个仍然可用的空闲实例，失效的实例直接丢弃；没有可用实例时返回None"""
+        while True:
+            try:
+                crawler = idle.get_nowait()[1]
+            except queue.Empty:
+                return None
+            if crawler.is_alive():
+                return crawler
+            logger.info("丢弃已失效的爬虫实例")
+            self.release(crawler, discard=True)
+
+    def acquire(self, browser_type: str, headless: bool) -> Any:
+        """
+        获取一个已设置好的爬虫实例
+
+        优先复用空闲且会话仍然可用的实例，其次在名额允许时创建新实例，
+        否则等待其他请求归还实例。
+
+        Raises:
+            PoolExhaustedError: 超时仍没有可用实例
+        """
+        key = (browser_type, headless)
+        idle = self._idle_queue(key)
+        deadline = time.monotonic() + self._timeout
+
+        while True:
+            with self._lock:
+                generation = self._generation
+
+            crawler = self._take_idle(idle)
+            if crawler is not None:
+                return crawler
+
+            if self._reserve_slot(key):
+                try:
+                    crawler = self._factory()
+                    crawler.setup(browser_type=browser_type, headless=headless)
+                except Exception:
+                    self._free_slot()
+                    raise
+                return crawler
+
+            # 等待任意分组有实例归还、名额被释放，然后重新尝试
+            with self._changed:
+                while self._generation == generation:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(f"{self._timeout}秒内没有可用的爬虫实例")
+                    self._changed.wait(remaining)
+
+    def release(self, crawler: Any, discard: bool = False) -> None:
+        """
+        归还爬虫实例，归还前清除会话状态，避免cookie等泄露给下一个请求
+
+        Args:
+            crawler: 由 acquire 获取的实例
+            discard: 为 True 时直接关闭实例（例如浏览器会话可能已损坏）
+        """
+        if not discard:
+            try:
+                crawler.reset_state()
+            except Exception as e:
+                logger.warning("重置爬虫实例状态失败，丢弃该实例: %s", e)
+                discard = True
+        if discard:
+            self._close(crawler)
+            self._free_slot()
+            return
+        # 空闲队列中保存 (归还时间, 实例)，用于回收长时间未使用的实例
+        self._idle_queue((crawler.browser_type, crawler.headless)).put((time.monotonic(), crawler))
+        with self._lock:
+            self._notify_locked()
+
+    def warm_up(self, browser_type: str, headless: bool, count: int) -> int:
+        """
+        预先创建指定数量的爬虫实例并放回池中
+
+        Returns:
+            int: 实际创建成功的实例数量
+        """
+        crawlers = []
+        try:
+            for _ in range(min(count, self._size)):
+                crawlers.append(self.acquire(browser_type, headless))
+        except Exception as e:
+            logger.warning("预热爬虫实例池失败: %s", e)
+        for crawler in crawlers:
+            self.release(crawler)
+        return len(crawlers)
+
+    @contextmanager
+    def lease(self, browser_type: str, headless: bool) -> Iterator[Any]:
+        """以上下文管理器方式借用实例，发生异常时丢弃该实例"""
+        crawler = self.acquire(browser_type, headless)
+        try:
+            yield crawler
+        except Exception:
+            self.release(crawler, discard=True)
+            raise
+        else:
+            self.release(crawler)
+
+    def close_all(self) -> None:
+        """关闭池中所有空闲实例"""
+        with self._lock:
+            queues = list(self._idle.values())
+        for idle in queues:
+            while True:
+                try:
+                    _, crawler = idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._close(crawler)
+                self._free_slot()
+
+    def evict_idle(self, max_idle: float) -> int:
+        """
+        关闭空闲超过指定时间的实例
+
+        Args:
+            max_idle: 最长空闲时间（秒）
+
+        Returns:
+            int: 被关闭的实例数量
+        """
+        deadline = time.monotonic() - max_idle
+        with self._lock:
+            queues = list(self._idle.values())
+        evicted = 0
+        for idle in queues:
+            fresh = []
+            while True:
+                try:
+                    entry = idle.get_nowait()
+                except queue.Empty:
+                    break
+                if entry[0] < deadline:
+                    self._close(entry[1])
+                    self._free_slot()
+                    evicted += 1
+                else:
+                    fresh.append(entry)
+            for entry in fresh:
+                idle.put(entry)
+            if fresh:
+                # 检查期间队列暂时为空，等待中的 acquire 需要重新尝试取出放回的实例
+                with self._lock:
+                    self._notify_locked()
+        return evicted
+
+    def start_janitor(self, max_idle: float, interval: float = 60) -> threading.Thread:
+        """启动后台线程，定期关闭空闲超过 max_idle 秒的实例"""
+        def run():
+            while True:
+                time.sleep(interval)
+                evicted = self.evict_idle(max_idle)
+                if evicted:
+                    logger.info("关闭了 %d 个空闲的爬虫实例", evicted)
+
+        thread = threading.Thread(target=run, name="crawler-pool-janitor", daemon=True)
+        thread.start()
+        return thread
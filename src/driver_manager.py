@@ -9,29 +9,98 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.common.exceptions import WebDriverException
+
+try:
+    # selenium 4.26+ 才提供 ClientConfig
+    from selenium.webdriver.remote.client_config import ClientConfig
+except ImportError:
+    ClientConfig = None
 
 # 导入配置
 from config import (
     DEFAULT_BROWSER, 
     HEADLESS_MODE, 
     PAGE_LOAD_TIMEOUT, 
-    PAGE_WAIT_TIMEOUT,
     USER_AGENT,
     REMOTE_WEBDRIVER_URL,
+    REMOTE_POOL_MAXSIZE,
     USE_REMOTE_WEBDRIVER,
+    BLOCK_MEDIA_RESOURCES,
+    BLOCKED_URL_PATTERNS,
     get_browser_options
 )
+from utils import retry_on_exception
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
-def get_driver(browser_type=DEFAULT_BROWSER, headless=HEADLESS_MODE):
+# Chrome启动参数在导入时构建一次，创建驱动时直接批量加入
+_CHROME_ARGUMENTS = (
+    f"--user-agent={USER_AGENT}",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--window-size=1920,1080",
+    "--disable-extensions",
+    "--disable-popup-blocking",
+    "--disable-infobars",
+    "--disable-notifications",
+    "--disable-translate",
+    "--disable-logging",
+    "--log-level=3",
+    "--silent",
+)
+
+@retry_on_exception(exceptions=(WebDriverException,), logger=logger)
+def _create_remote_driver(options):
+    """
+    创建远程WebDriver
+
+    urllib3 默认连接池只有1个连接，并发命令会排队并出现 "Connection pool is full" 警告，
+    因此在支持 ClientConfig 的版本中放大连接池
+    """
+    logger.info("使用远程WebDriver: %s", REMOTE_WEBDRIVER_URL)
+    if ClientConfig is None:
+        return webdriver.Remote(command_executor=REMOTE_WEBDRIVER_URL, options=options)
+    # selenium 从 init_args_for_pool_manager["init_args_for_pool_manager"] 读取 urllib3.PoolManager 参数
+    client_config = ClientConfig(
+        remote_server_addr=REMOTE_WEBDRIVER_URL,
+        init_args_for_pool_manager={
+            "init_args_for_pool_manager": {"maxsize": REMOTE_POOL_MAXSIZE, "block": False}
+        }
+    )
+    return webdriver.Remote(
+        command_executor=REMOTE_WEBDRIVER_URL,
+        options=options,
+        client_config=client_config
+    )
+
+def _block_resources(driver):
+    """
+    通过CDP拦截字体、音视频和统计脚本等与内容提取无关的请求
+
+    只有本地Chrome驱动提供 execute_cdp_cmd，远程驱动仅依赖禁止图片的偏好设置
+    """
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except WebDriverException as e:
+        logger.warning("设置资源拦截失败: %s", e)
+
+def get_driver(browser_type=DEFAULT_BROWSER, headless=HEADLESS_MODE, extra_arguments=None, extra_prefs=None,
+               page_load_strategy=None):
     """
     获取配置好的WebDriver实例
     
     Args:
         browser_type: 浏览器类型，支持"chrome"或"firefox"
         headless: 是否使用无头模式
+        extra_arguments: 额外的Chrome启动参数（如 --host-resolver-rules=...）
+        extra_prefs: 额外的Chrome偏好设置，与默认偏好合并
+        page_load_strategy: 页面加载策略（normal/eager/none），默认使用浏览器配置中的策略或 eager
         
     Returns:
         WebDriver实例
@@ -39,10 +108,11 @@ def get_driver(browser_type=DEFAULT_BROWSER, headless=HEADLESS_MODE):
     Raises:
         ValueError: 如果指定了不支持的浏览器类型
     """
-    logger.info(f"初始化WebDriver: {browser_type} {'headless' if headless else 'normal'} mode")
+    logger.info("初始化WebDriver: %s %s mode", browser_type, "headless" if headless else "normal")
     
     # 获取浏览器选项配置
     browser_options = get_browser_options(browser_type)
+    page_load_strategy = page_load_strategy or browser_options.get("page_load_strategy", "eager")
     
     if browser_type.lower() == "chrome":
         options = ChromeOptions()
@@ -50,35 +120,33 @@ def get_driver(browser_type=DEFAULT_BROWSER, headless=HEADLESS_MODE):
             options.add_argument("--headless")
         
         # 添加Chrome选项
-        options.add_argument(f"--user-agent={USER_AGENT}")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-popup-blocking")
-        options.add_argument("--disable-infobars")
-        options.add_argument("--disable-notifications")
-        options.add_argument("--disable-translate")
-        options.add_argument("--disable-logging")
-        options.add_argument("--log-level=3")
-        options.add_argument("--silent")
+        options.arguments.extend(_CHROME_ARGUMENTS)
+        if extra_arguments:
+            options.arguments.extend(extra_arguments)
         
         # 设置页面加载策略
-        options.page_load_strategy = browser_options.get("page_load_strategy", "eager")
+        options.page_load_strategy = page_load_strategy
+        
+        prefs = {}
+        if BLOCK_MEDIA_RESOURCES:
+            # 禁止加载图片
+            prefs["profile.managed_default_content_settings.images"] = 2
+        if extra_prefs:
+            prefs.update(extra_prefs)
+        if prefs:
+            options.add_experimental_option("prefs", prefs)
         
         if USE_REMOTE_WEBDRIVER:
             # 使用远程WebDriver
-            logger.info(f"使用远程WebDriver: {REMOTE_WEBDRIVER_URL}")
-            driver = webdriver.Remote(
-                command_executor=REMOTE_WEBDRIVER_URL,
-                options=options
-            )
+            driver = _create_remote_driver(options)
         else:
             # 使用本地WebDriver
             service = ChromeService()
             driver = webdriver.Chrome(service=service, options=options)
         
+        if BLOCK_MEDIA_RESOURCES:
+            _block_resources(driver)
+        
     elif browser_type.lower() == "firefox":
         options = FirefoxOptions()
         if headless:
@@ -92,27 +160,24 @@ def get_driver(browser_type=DEFAULT_BROWSER, headless=HEADLESS_MODE):
         options.set_preference("general.useragent.override", USER_AGENT)
         
         # 设置页面加载策略
-        options.set_preference("pageLoadStrategy", browser_options.get("page_load_strategy", "eager"))
+        options.set_preference("pageLoadStrategy", page_load_strategy)
         
         if USE_REMOTE_WEBDRIVER:
             # 使用远程WebDriver
-            logger.info(f"使用远程WebDriver: {REMOTE_WEBDRIVER_URL}")
-            driver = webdriver.Remote(
-                command_executor=REMOTE_WEBDRIVER_URL,
-                options=options
-            )
+            driver = _create_remote_driver(options)
         else:
             # 使用本地WebDriver
             service = FirefoxService()
             driver = webdriver.Firefox(service=service, options=options)
         
     else:
-        logger.error(f"不支持的浏览器类型: {browser_type}")
+        logger.error("不支持的浏览器类型: %s", browser_type)
         raise ValueError(f"不支持的浏览器类型: {browser_type}")
     
     # 设置超时时间
     driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-    driver.implicitly_wait(PAGE_WAIT_TIMEOUT)
+    # 不使用隐式等待，避免每次查找不存在的元素都阻塞；需要等待时使用显式等待
+    driver.implicitly_wait(0)
     
-    logger.info(f"WebDriver初始化成功: {browser_type}")
+    logger.info("WebDriver初始化成功: %s", browser_type)
     return driver
\ No newline at end of file
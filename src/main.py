@@ -9,6 +9,11 @@ import logging
 import click
 from typing import List, Optional, Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 导入配置
 from config import (
     API_HOST, 
@@ -18,16 +23,20 @@ from config import (
     HEADLESS_MODE
 )
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 设置日志（仅在尚未配置时）
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger(__name__)
 
-# 导入爬虫和API服务器
-from crawler import WebCrawler
-from api_server import start_api_server
+def _dumps_json(results: List[Dict[str, Any]]) -> str:
+    """将结果序列化为缩进的JSON字符串，orjson可用时使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    import json
+    return json.dumps(results, ensure_ascii=False, indent=2)
 
 @click.group()
 def cli():
@@ -56,8 +65,11 @@ def crawl(urls: List[str], browser: str, headless: bool, output: Optional[str],
     
     URLS: 要爬取的一个或多个URL
     """
-    logger.info(f"启动爬虫 - 浏览器: {browser}, 无头模式: {headless}")
-    logger.info(f"要爬取的URL: {urls}")
+    logger.info("启动爬虫 - 浏览器: %s, 无头模式: %s", browser, headless)
+    logger.info("要爬取的URL: %s", urls)
+    
+    # 延迟导入，避免 server 命令加载Selenium
+    from crawler import WebCrawler
     
     results = []
     
@@ -86,8 +98,7 @@ def crawl(urls: List[str], browser: str, headless: bool, output: Optional[str],
                 # 写入文件
                 with open(output, 'w', encoding='utf-8') as f:
                     if format == 'json':
-                        import json
-                        json.dump(results, f, ensure_ascii=False, indent=2)
+                        f.write(_dumps_json(results))
                     elif format == 'text':
                         for result in results:
                             f.write(f"URL: {result['url']}\n")
@@ -98,12 +109,11 @@ def crawl(urls: List[str], browser: str, headless: bool, output: Optional[str],
                             f.write(f"<!-- URL: {result['url']} -->\n")
                             f.write(f"<!-- 标题: {result['title']} -->\n")
                             f.write(f"{result['content']}\n\n")
-                logger.info(f"结果已保存到 {output}")
+                logger.info("结果已保存到 %s", output)
             else:
                 # 输出到标准输出
                 if format == 'json':
-                    import json
-                    print(json.dumps(results, ensure_ascii=False, indent=2))
+                    print(_dumps_json(results))
                 elif format == 'text':
                     for result in results:
                         print(f"URL: {result['url']}")
@@ -119,7 +129,7 @@ def crawl(urls: List[str], browser: str, headless: bool, output: Optional[str],
             sys.exit(1)
             
     except Exception as e:
-        logger.exception(f"爬取过程中发生错误: {str(e)}")
+        logger.exception("爬取过程中发生错误: %s", e)
         sys.exit(1)
 
 @cli.command()
@@ -128,12 +138,15 @@ def crawl(urls: List[str], browser: str, headless: bool, output: Optional[str],
 @click.option('--debug/--no-debug', default=API_DEBUG, help=f'是否启用调试模式 (默认: {"是" if API_DEBUG else "否"})')
 def server(host: str, port: int, debug: bool):
     """启动API服务器"""
+    # 延迟导入，避免 crawl 命令加载Flask
+    from api_server import start_api_server
+    
     try:
         start_api_server(host=host, port=port, debug=debug)
     except KeyboardInterrupt:
         logger.info("API服务器已停止")
     except Exception as e:
-        logger.exception(f"API服务器启动失败: {str(e)}")
+        logger.exception("API服务器启动失败: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -1,25 +1,50 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 import requests
-from ..plugin_base import PluginBase
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE_URL = "https://api.example.com"
 
 class ApiAdapterPlugin:
     """外部API适配插件"""
+    def __init__(self, base_url: str = API_BASE_URL):
+        """创建复用连接的会话，避免每次调用都重新建立TCP/TLS连接"""
+        self._base_url = base_url
+        self._session = requests.Session()
+        self._session.headers.update({"Authorization": "Bearer YOUR_API_KEY"})
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            # 重试用尽后返回最后一次响应而不是抛出 RetryError，调用方仍能拿到状态码
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                              raise_on_status=False)
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+    
     def can_handle(self, url: str) -> bool:
         """检查URL是否指向我们的API端点"""
-        return url.startswith("https://api.example.com/")
+        return url.startswith(f"{self._base_url}/")
     
     def call_api(self, data: Dict) -> Dict:
         """调用外部API并返回结果"""
         endpoint = data.get("endpoint", "/v1/data")
         params = data.get("params", {})
         
-        response = requests.get(
-            f"https://api.example.com{endpoint}",
-            params=params,
-            headers={"Authorization": "Bearer YOUR_API_KEY"}
+        response = self._session.get(
+            f"{self._base_url}{endpoint}",
+            params=params
         )
         
         return {
             "status": response.status_code,
             "data": response.json()
-        }
\ No newline at end of file
+        }
+    
+    def call_api_batch(self, requests_data: List[Dict], max_workers: int = 16) -> List[Dict]:
+        """并发调用多个API请求，结果按输入顺序返回"""
+        if not requests_data:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests_data))) as executor:
+            return list(executor.map(self.call_api, requests_data))
@@ -1,6 +1,13 @@
 from typing import Dict, Any
-from bs4 import BeautifulSoup
-from ..plugin_base import PluginBase
+from lxml import etree, html as lxml_html
+
+# 以UTF-8字节解析，带 <?xml ... encoding=...?> 声明的XHTML页面也能解析
+_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+# XPath表达式在导入时编译一次
+_FIRST_H1 = etree.XPath("(//h1)[1]")
+_PARAGRAPHS = etree.XPath("//p")
+_FIRST_TIME = etree.XPath("(//time)[1]")
 
 class NewsParser:
     """新闻内容解析插件"""
@@ -10,15 +17,23 @@ class NewsParser:
     
     def parse(self, response: str) -> Dict[str, Any]:
         """解析新闻页面内容"""
-        soup = BeautifulSoup(response, "html.parser")
+        title, content, date = "", "", ""
+        try:
+            doc = lxml_html.fromstring(response.encode("utf-8"), parser=_PARSER)
+        except etree.ParserError:
+            # 空文档或只有注释的文档
+            doc = None
         
-        title = soup.find("h1").text.strip() if soup.find("h1") else ""
-        content = "\n".join(p.text.strip() for p in soup.find_all("p"))
-        date = soup.find("time")["datetime"] if soup.find("time") else ""
+        if doc is not None:
+            h1 = _FIRST_H1(doc)
+            title = h1[0].text_content().strip() if h1 else ""
+            content = "\n".join(p.text_content().strip() for p in _PARAGRAPHS(doc))
+            time_element = _FIRST_TIME(doc)
+            date = time_element[0].get("datetime", "") if time_element else ""
         
         return {
             "title": title,
             "content": content,
             "date": date,
             "type": "news"
-        }
\ No newline at end of file
+        }
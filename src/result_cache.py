@@ -0,0 +1,83 @@
+"""
+爬取结果缓存模块
+在进程内缓存最近爬取的URL结果，命中时无需再启动浏览器访问页面
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# 导入配置
+from config import RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES
+
+def _value_size(value: Any) -> int:
+    """估算缓存值中字符串占用的内存字节数，爬取结果的体积主要来自 content 等字符串字段"""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(sys.getsizeof(v) for v in value.values() if isinstance(v, str))
+    return 0
+
+class ResultCache:
+    """带过期时间的线程安全LRU缓存"""
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL,
+                 max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最多缓存的条目数，为0时禁用缓存
+            ttl: 条目的存活时间（秒）
+            max_bytes: 所有条目中字符串内容的总字节数上限，超出时淘汰最久未使用的条目
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # 键 -> (过期时间, 值, 字节数)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def _pop_locked(self, key: Hashable) -> None:
+        """在持有锁时删除条目并扣减字节数"""
+        self._bytes -= self._data.pop(key)[2]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存值，不存在或已过期时返回None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._pop_locked(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出条目数或字节数上限时淘汰最久未使用的条目；单个值超过字节数上限时不缓存"""
+        if self._maxsize <= 0:
+            return
+        size = _value_size(value)
+        with self._lock:
+            if key in self._data:
+                self._pop_locked(key)
+            if size > self._max_bytes:
+                return
+            self._data[key] = (time.monotonic() + self._ttl, value, size)
+            self._bytes += size
+            while len(self._data) > self._maxsize or self._bytes > self._max_bytes:
+                self._pop_locked(next(iter(self._data)))
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
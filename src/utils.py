@@ -0,0 +1,54 @@
+"""
+工具函数模块
+提供重试等通用功能
+"""
+
+import functools
+import logging
+import random
+import time
+from typing import Any, Callable, Optional, Tuple, Type
+
+# 导入配置
+from config import MAX_RETRIES, RETRY_DELAY
+
+def retry_on_exception(exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+                       retries: int = MAX_RETRIES, base_delay: float = RETRY_DELAY,
+                       max_delay: float = 30.0, logger: Optional[logging.Logger] = None) -> Callable:
+    """
+    函数抛出指定异常时按截断指数退避加随机抖动重试的装饰器
+
+    第 i 次重试前等待 min(max_delay, base_delay * 2**i * uniform(0.5, 1.5)) 秒，
+    多个工作线程同时失败时不会在同一时刻一起重试，单次等待也不会超过 max_delay。
+
+    Args:
+        exceptions: 需要重试的异常类型
+        retries: 最多重试次数（不含首次调用）
+        base_delay: 首次重试前的基准等待时间（秒）
+        max_delay: 单次等待时间上限（秒），加入抖动后仍不超过该值
+        logger: 记录重试信息的日志记录器，默认使用本模块的记录器
+
+    Returns:
+        Callable: 装饰器
+    """
+    log = logger or logging.getLogger(__name__)
+
+    def decorator(func: Callable) -> Callable:
+        if retries <= 0:
+            # 不重试时不包装，调用没有额外开销
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt >= retries:
+                        raise
+                    delay = min(max_delay, base_delay * 2 ** attempt * random.uniform(0.5, 1.5))
+                    log.warning("%s 失败（第 %d 次）: %s，%.1f 秒后重试",
+                                func.__name__, attempt + 1, e, delay)
+                    time.sleep(delay)
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+"""
+pytest 公共配置
+"""
+
+import os
+import socket
+import sys
+
+import pytest
+
+# src 中的模块使用 "from config import ..." 形式的导入，需要把 src 加入模块搜索路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+def pytest_addoption(parser):
+    """添加 --run-selenium 选项，启用需要真实浏览器的测试"""
+    parser.addoption(
+        "--run-selenium",
+        action="store_true",
+        default=False,
+        help="运行需要启动浏览器和访问外部网站的测试"
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "selenium: 需要启动浏览器的测试，使用 --run-selenium 运行")
+
+def pytest_collection_modifyitems(config, items):
+    """未指定 --run-selenium 时跳过标记为 selenium 的测试"""
+    if config.getoption("--run-selenium"):
+        return
+    skip_selenium = pytest.mark.skip(reason="需要 --run-selenium 选项才会运行")
+    for item in items:
+        if "selenium" in item.keywords:
+            item.add_marker(skip_selenium)
+
+# 测试中访问的主机，会话开始时解析一次
+TEST_HOSTS = ("example.com", "example.org")
+
+def _host_resolver_rules():
+    """
+    解析测试主机并生成Chrome的 --host-resolver-rules 参数，解析失败的主机交由浏览器自行解析
+
+    只用于本地浏览器：远程 Grid 节点与测试机的网络可能不同，在测试机上解析出的地址节点未必可达
+    """
+    # 与 driver_manager 读取同一份配置模块
+    from config import USE_REMOTE_WEBDRIVER
+    
+    if USE_REMOTE_WEBDRIVER:
+        return []
+    rules = []
+    for host in TEST_HOSTS:
+        try:
+            rules.append(f"MAP {host} {socket.gethostbyname(host)}")
+        except OSError:
+            continue
+    return [f"--host-resolver-rules={','.join(rules)}"] if rules else []
+
+# 测试只检查标题和正文，不需要图片；样式表保留，否则 innerText 的换行和隐藏元素判断会变化。
+# Chrome 没有禁止字体的内容设置，字体由 driver_manager 按 BLOCKED_URL_PATTERNS 拦截
+TEST_CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2
+}
+
+@pytest.fixture(scope="session")
+def shared_crawler():
+    """整个测试会话共用的已启动爬虫，避免每个测试都重新启动浏览器"""
+    from src.crawler import WebCrawler
+    
+    crawler = WebCrawler()
+    crawler.setup(
+        extra_arguments=_host_resolver_rules(),
+        extra_prefs=TEST_CHROME_PREFS,
+        page_load_strategy="eager"
+    )
+    yield crawler
+    crawler.cleanup()
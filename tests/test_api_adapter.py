@@ -0,0 +1,99 @@
+"""
+ApiAdapterPlugin 的单元测试
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.plugins.api.api_adapter import ApiAdapterPlugin
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """/v1/status/<code> 返回指定状态码，其他路径原样返回路径和查询参数；delay 参数指定响应前等待的秒数"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.server.hits.append(parts.path)
+        delay = parse_qs(parts.query).get("delay")
+        if delay:
+            time.sleep(float(delay[0]))
+        if parts.path.startswith("/v1/status/"):
+            status = int(parts.path.rsplit("/", 1)[1])
+            body = {"error": status}
+        else:
+            status = 200
+            body = {"path": parts.path, "params": parse_qs(parts.query)}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def api_server():
+    """在本机随机端口启动伪API服务器"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApiHandler)
+    server.hits = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def plugin(api_server):
+    """指向伪API服务器的插件"""
+    plugin = ApiAdapterPlugin(base_url=f"http://127.0.0.1:{api_server.server_port}")
+    # 不使用环境变量中的代理设置
+    plugin._session.trust_env = False
+    return plugin
+
+def test_can_handle(plugin, api_server):
+    """测试只处理指向API地址的URL"""
+    assert plugin.can_handle(f"http://127.0.0.1:{api_server.server_port}/v1/data")
+    assert not plugin.can_handle("https://example.com/v1/data")
+
+def test_call_api(plugin):
+    """测试返回状态码和解析后的JSON"""
+    result = plugin.call_api({"endpoint": "/v1/items", "params": {"id": "1"}})
+
+    assert result == {"status": 200, "data": {"path": "/v1/items", "params": {"id": ["1"]}}}
+
+def test_call_api_returns_status_after_retries(plugin, api_server):
+    """测试5xx响应重试用尽后仍返回最后一次的状态码，而不是抛出异常"""
+    result = plugin.call_api({"endpoint": "/v1/status/503"})
+
+    assert result == {"status": 503, "data": {"error": 503}}
+    assert len(api_server.hits) == 4
+
+def test_call_api_does_not_retry_client_errors(plugin, api_server):
+    """测试4xx响应不重试"""
+    result = plugin.call_api({"endpoint": "/v1/status/404"})
+
+    assert result["status"] == 404
+    assert len(api_server.hits) == 1
+
+def test_call_api_batch_keeps_input_order(plugin):
+    """测试并发调用时结果按输入顺序返回，与完成顺序无关"""
+    requests_data = [
+        {"endpoint": f"/v1/items/{i}", "params": {"delay": str(delay)}}
+        for i, delay in enumerate([0.3, 0.2, 0.1, 0])
+    ]
+
+    results = plugin.call_api_batch(requests_data)
+
+    assert [result["data"]["path"] for result in results] == [f"/v1/items/{i}" for i in range(4)]
+    assert all(result["status"] == 200 for result in results)
+
+def test_call_api_batch_empty(plugin, api_server):
+    """测试空列表直接返回空结果，不发起请求"""
+    assert plugin.call_api_batch([]) == []
+    assert api_server.hits == []
@@ -3,134 +3,308 @@ API服务器的单元测试
 """
 
 import json
+import os
 import threading
 import time
-import unittest
+import pytest
 import requests
+from requests.adapters import HTTPAdapter
 from flask import Flask
+from selenium.common.exceptions import JavascriptException
 
+from src import api_server
 from src.api_server import app, start_api_server
 from src.config import API_HOST, API_PORT
 
-class TestAPIServer(unittest.TestCase):
-    """API服务器测试类"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """在所有测试之前启动API服务器"""
-        # 使用测试配置
-        cls.test_port = 5001
-        cls.base_url = f"http://127.0.0.1:{cls.test_port}"
-        
-        # 在单独的线程中启动API服务器
-        cls.server_thread = threading.Thread(
-            target=start_api_server,
-            kwargs={"host": "127.0.0.1", "port": cls.test_port, "debug": False}
-        )
-        cls.server_thread.daemon = True
-        cls.server_thread.start()
-        
-        # 等待服务器启动
-        time.sleep(1)
-    
-    def test_index_endpoint(self):
-        """测试根端点"""
-        response = requests.get(f"{self.base_url}/")
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertIn("name", data)
-        self.assertIn("version", data)
-        self.assertIn("endpoints", data)
-    
-    def test_status_endpoint(self):
-        """测试状态端点"""
-        response = requests.get(f"{self.base_url}/api/status")
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(data["status"], "running")
-        self.assertIn("active_crawlers", data)
-        self.assertIn("uptime", data)
-    
-    def test_extract_endpoint_invalid_request(self):
-        """测试提取端点 - 无效请求"""
-        # 空请求
-        response = requests.post(f"{self.base_url}/api/extract", json={})
-        self.assertEqual(response.status_code, 400)
-        
-        # 缺少URL
-        response = requests.post(f"{self.base_url}/api/extract", json={"options": {}})
-        self.assertEqual(response.status_code, 400)
-    
-    def test_extract_endpoint_valid_request(self):
-        """测试提取端点 - 有效请求"""
-        # 注意：这个测试会实际启动浏览器并爬取网页，可能会比较慢
-        response = requests.post(
-            f"{self.base_url}/api/extract",
-            json={"url": "https://example.com", "options": {"headless": True}}
-        )
-        
-        # 如果测试环境没有浏览器，这个测试可能会失败
-        # 在这种情况下，我们可以跳过这个测试
-        if response.status_code == 500 and "WebDriver" in response.text:
-            self.skipTest("WebDriver不可用")
-        
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(data["status"], "success")
-        self.assertEqual(data["url"], "https://example.com")
-        self.assertIn("title", data)
-        self.assertIn("content", data)
-    
-    def test_extract_text_endpoint(self):
-        """测试提取文本端点"""
-        # 注意：这个测试会实际启动浏览器并爬取网页，可能会比较慢
-        response = requests.post(
-            f"{self.base_url}/api/extract-text",
-            json={"url": "https://example.com", "selector": "body", "options": {"headless": True}}
-        )
-        
-        # 如果测试环境没有浏览器，这个测试可能会失败
-        if response.status_code == 500 and "WebDriver" in response.text:
-            self.skipTest("WebDriver不可用")
-        
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(data["status"], "success")
-        self.assertEqual(data["url"], "https://example.com")
-        self.assertIn("title", data)
-        self.assertIn("text_content", data)
-        self.assertIn("Example Domain", data["text_content"])
-    
-    def test_batch_endpoint(self):
-        """测试批量提取端点"""
-        # 注意：这个测试会实际启动浏览器并爬取网页，可能会比较慢
-        response = requests.post(
-            f"{self.base_url}/api/batch",
-            json={
-                "urls": ["https://example.com", "https://example.org"],
-                "options": {"headless": True}
-            }
-        )
-        
-        # 如果测试环境没有浏览器，这个测试可能会失败
-        if response.status_code == 500 and "WebDriver" in response.text:
-            self.skipTest("WebDriver不可用")
-        
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(data["status"], "success")
-        self.assertEqual(data["count"], 2)
-        self.assertEqual(len(data["results"]), 2)
-        
-        for result, url in zip(data["results"], ["https://example.com", "https://example.org"]):
-            self.assertEqual(result["url"], url)
-            self.assertIn("title", result)
-            self.assertIn("content", result)
-
-if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+# api_server 以顶层模块名导入 crawler_pool/result_cache，测试需使用同一份模块中的类，
+# 否则池抛出的 PoolExhaustedError 与 api_server 捕获的不是同一个类
+CrawlerPool = api_server.CrawlerPool
+ResultCache = api_server.ResultCache
+
+class FakeCrawler:
+    """按URL返回固定结果的伪爬虫，不启动浏览器"""
+    
+    def setup(self, browser_type="chrome", headless=True):
+        self.browser_type = browser_type
+        self.headless = headless
+    
+    def crawl_urls(self, urls, handle_pagination=True):
+        return [{"url": url, "title": url, "content": ""} for url in urls if "invalid" not in url]
+    
+    def extract_text_content(self, selector="body"):
+        if selector.endswith("["):
+            raise JavascriptException("SyntaxError: not a valid selector")
+        return "Example Domain"
+    
+    def is_alive(self):
+        return True
+    
+    def reset_state(self):
+        pass
+    
+    def cleanup(self):
+        pass
+
+def _wait_ready(session, url, timeout=5.0):
+    """轮询直到服务器可以响应请求，超时后交由各测试自行报告连接错误"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            session.get(url, timeout=0.1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.05)
+
+@pytest.fixture(scope="session")
+def session_client():
+    """所有测试共用的HTTP会话，复用到测试服务器的keep-alive连接"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    yield session
+    session.close()
+
+@pytest.fixture(scope="session")
+def base_url(session_client):
+    """在后台线程中启动API服务器，返回其地址"""
+    # pytest-xdist 并行运行时每个工作进程使用不同的端口
+    port = 5001 + int(os.environ.get("PYTEST_XDIST_WORKER", "gw0")[2:])
+    server_thread = threading.Thread(
+        target=start_api_server,
+        kwargs={"host": "127.0.0.1", "port": port, "debug": False},
+        daemon=True
+    )
+    server_thread.start()
+    
+    url = f"http://127.0.0.1:{port}"
+    _wait_ready(session_client, f"{url}/api/status")
+    return url
+
+@pytest.fixture
+def fake_crawler_pool(monkeypatch):
+    """用伪爬虫替换实例池和缓存，只测试HTTP层，不启动浏览器"""
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(FakeCrawler, size=1, timeout=1))
+    monkeypatch.setattr(api_server, "result_cache", ResultCache(maxsize=0))
+
+def test_index_endpoint(base_url, session_client):
+    """测试根端点"""
+    response = session_client.get(f"{base_url}/")
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert "name" in data
+    assert "version" in data
+    assert "endpoints" in data
+
+def test_status_endpoint(base_url, session_client):
+    """测试状态端点"""
+    response = session_client.get(f"{base_url}/api/status")
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["status"] == "running"
+    assert "active_crawlers" in data
+    assert "uptime" in data
+
+def test_extract_endpoint_invalid_request(base_url, session_client):
+    """测试提取端点 - 无效请求"""
+    # 空请求
+    response = session_client.post(f"{base_url}/api/extract", json={})
+    assert response.status_code == 400
+    
+    # 缺少URL
+    response = session_client.post(f"{base_url}/api/extract", json={"options": {}})
+    assert response.status_code == 400
+
+def test_extract_endpoint_valid_request(base_url, session_client, fake_crawler_pool):
+    """测试提取端点 - 有效请求"""
+    response = session_client.post(
+        f"{base_url}/api/extract",
+        json={"url": "https://example.com", "options": {"headless": True}}
+    )
+    
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["url"] == "https://example.com"
+    assert "title" in data
+    assert "content" in data
+
+def test_extract_text_endpoint(base_url, session_client, fake_crawler_pool):
+    """测试提取文本端点"""
+    response = session_client.post(
+        f"{base_url}/api/extract-text",
+        json={"url": "https://example.com", "selector": "body", "options": {"headless": True}}
+    )
+    
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["url"] == "https://example.com"
+    assert "title" in data
+    assert "text_content" in data
+    assert "Example Domain" in data["text_content"]
+
+@pytest.mark.selenium
+def test_browser_endpoints_batched(base_url, session_client):
+    """
+    端到端测试：一次 /api/batch 请求完成所有真实浏览器爬取
+    
+    /api/extract 和 /api/extract-text 的响应格式由上面使用伪爬虫的测试覆盖
+    """
+    urls = ["https://example.com", "https://example.org"]
+    response = session_client.post(
+        f"{base_url}/api/batch",
+        json={"urls": urls, "options": {"headless": True}}
+    )
+    
+    # 如果测试环境没有浏览器，这个测试可能会失败
+    if response.status_code == 500 and "WebDriver" in response.text:
+        pytest.skip("WebDriver不可用")
+    
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["count"] == len(urls)
+    
+    for result, url in zip(data["results"], urls):
+        assert result["url"] == url
+        assert "Example Domain" in result["title"]
+        assert "Example Domain" in result["content"]
+
+def test_crawl_urls_parallel_keeps_order(monkeypatch):
+    """测试并行爬取保持输入顺序并跳过失败的URL"""
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(FakeCrawler, size=3, timeout=1))
+    monkeypatch.setattr(api_server, "result_cache", ResultCache(maxsize=0))
+    urls = [f"https://example.com/{i}" for i in range(7)] + ["https://invalid.example"]
+    
+    results = api_server.crawl_urls_parallel(urls, "chrome", True)
+    
+    assert [r["url"] for r in results] == urls[:-1]
+
+def test_crawl_urls_parallel_limits_per_host_concurrency(monkeypatch):
+    """测试并行爬取时同一主机的并发数不超过上限"""
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+    
+    class SlowCrawler(FakeCrawler):
+        def crawl_urls(self, urls, handle_pagination=True):
+            host = urls[0].split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+            return super().crawl_urls(urls, handle_pagination)
+    
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(SlowCrawler, size=6, timeout=1))
+    monkeypatch.setattr(api_server, "result_cache", ResultCache(maxsize=0))
+    monkeypatch.setattr(api_server, "BATCH_MAX_WORKERS", 6)
+    monkeypatch.setattr(api_server, "BATCH_PER_HOST_CONCURRENCY", 2)
+    urls = [f"https://a.example/{i}" for i in range(6)] + [f"https://b.example/{i}" for i in range(6)]
+    
+    results = api_server.crawl_urls_parallel(urls, "chrome", True)
+    
+    assert [r["url"] for r in results] == urls
+    assert peak == {"a.example": 2, "b.example": 2}
+
+def test_crawl_urls_parallel_uses_result_cache(monkeypatch):
+    """测试并行爬取复用缓存结果，只爬取未命中的URL"""
+    crawled = []
+    
+    class RecordingCrawler(FakeCrawler):
+        def crawl_urls(self, urls, handle_pagination=True):
+            crawled.extend(urls)
+            return super().crawl_urls(urls, handle_pagination)
+    
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(RecordingCrawler, size=2, timeout=1))
+    monkeypatch.setattr(api_server, "result_cache", ResultCache(maxsize=8, ttl=60))
+    
+    api_server.crawl_urls_parallel(["https://example.com/1"], "chrome", True)
+    results = api_server.crawl_urls_parallel(["https://example.com/1", "https://example.com/2"], "chrome", True)
+    
+    assert [r["url"] for r in results] == ["https://example.com/1", "https://example.com/2"]
+    assert crawled == ["https://example.com/1", "https://example.com/2"]
+
+def test_invalid_urls_rejected_before_crawling(monkeypatch):
+    """测试无效URL在获取爬虫实例之前被拒绝或过滤"""
+    crawled = []
+    
+    class RecordingCrawler(FakeCrawler):
+        def crawl_urls(self, urls, handle_pagination=True):
+            crawled.extend(urls)
+            return super().crawl_urls(urls, handle_pagination)
+    
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(RecordingCrawler, size=2, timeout=1))
+    monkeypatch.setattr(api_server, "result_cache", ResultCache(maxsize=0))
+    client = app.test_client()
+    
+    response = client.post("/api/extract", json={"url": "ftp://example.com"})
+    assert response.status_code == 400
+    assert "ftp://example.com" in response.get_json()["message"]
+    
+    response = client.post("/api/batch", json={"urls": ["example.com", 42, "https://example.com/1"]})
+    assert response.status_code == 200
+    assert [r["url"] for r in response.get_json()["results"]] == ["https://example.com/1"]
+    assert crawled == ["https://example.com/1"]
+    
+    response = client.post("/api/batch", json={"urls": ["example.com"]})
+    assert response.status_code == 400
+
+def test_pool_exhausted_returns_503(monkeypatch):
+    """测试实例池已满时返回503"""
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(FakeCrawler, size=0, timeout=0))
+    monkeypatch.setattr(api_server, "result_cache", ResultCache(maxsize=0))
+    client = app.test_client()
+    
+    response = client.post("/api/extract", json={"url": "https://example.com"})
+    assert response.status_code == 503
+    
+    response = client.post("/api/batch", json={"urls": ["https://example.com"]})
+    assert response.status_code == 503
+
+@pytest.mark.parametrize("options", [
+    {"browser": ["a"]},
+    {"browser": "opera"},
+    {"headless": {}},
+    {"headless": "true"},
+    {"handle_pagination": 1}
+])
+def test_invalid_options_rejected(monkeypatch, options):
+    """测试无效的爬取选项在获取爬虫实例之前返回400"""
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(FakeCrawler, size=0, timeout=0))
+    client = app.test_client()
+    
+    response = client.post("/api/extract", json={"url": "https://example.com", "options": options})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("selector", [1, ["body"], "", "  "])
+def test_invalid_selector_rejected(monkeypatch, selector):
+    """测试非字符串或空的选择器在获取爬虫实例之前返回400"""
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(FakeCrawler, size=0, timeout=0))
+    client = app.test_client()
+    
+    response = client.post("/api/extract-text", json={"url": "https://example.com", "selector": selector})
+    assert response.status_code == 400
+
+def test_malformed_selector_keeps_crawler(monkeypatch):
+    """测试语法错误的选择器返回400，爬虫实例归还池中供下一个请求复用"""
+    created = []
+    
+    def factory():
+        created.append(FakeCrawler())
+        return created[-1]
+    
+    monkeypatch.setattr(api_server, "crawler_pool", CrawlerPool(factory, size=1, timeout=0))
+    client = app.test_client()
+    
+    response = client.post("/api/extract-text", json={"url": "https://example.com", "selector": "div["})
+    assert response.status_code == 400
+    
+    response = client.post("/api/extract-text", json={"url": "https://example.com"})
+    assert response.status_code == 200
+    assert len(created) == 1
@@ -7,7 +7,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from src import crawler as crawler_module
 from src.crawler import WebCrawler
+from src.crawler_pool import CrawlerPool
 from src.config import DEFAULT_BROWSER, HEADLESS_MODE
 
 def test_crawler_initialization():
@@ -18,6 +20,7 @@ def test_crawler_initialization():
     assert crawler.browser_type == DEFAULT_BROWSER
     assert crawler.headless == HEADLESS_MODE
 
+@pytest.mark.selenium
 def test_crawler_setup():
     """测试爬虫设置"""
     crawler = WebCrawler()
@@ -30,6 +33,7 @@ def test_crawler_setup():
     finally:
         crawler.cleanup()
 
+@pytest.mark.selenium
 def test_crawler_cleanup():
     """测试爬虫清理"""
     crawler = WebCrawler()
@@ -39,86 +43,227 @@ def test_crawler_cleanup():
     crawler.cleanup()
     assert crawler.driver is None
 
-def test_crawl_single_url():
-    """测试单个URL爬取"""
-    crawler = WebCrawler()
-    crawler.setup()
-    
-    try:
-        # 爬取示例网页
+# 最后访问 example.com，爬取结束后可直接在该页面上提取文本
+EXAMPLE_URLS = ["https://example.org", "https://example.com"]
+INVALID_URL = "https://this-is-an-invalid-domain-123456.com"
+
+@pytest.fixture(scope="module")
+def example_crawl(shared_crawler):
+    """一次爬取所有示例网页（夹带一个无法访问的URL），供下面的各项检查共用"""
+    results = shared_crawler.crawl_urls([EXAMPLE_URLS[0], INVALID_URL, EXAMPLE_URLS[1]])
+    text = shared_crawler.extract_text_content("body")
+    return {"results": results, "text": text}
+
+def check_result_count(crawl):
+    assert len(crawl["results"]) == len(EXAMPLE_URLS)
+
+def check_result_urls(crawl):
+    assert [result["url"] for result in crawl["results"]] == EXAMPLE_URLS
+
+def check_invalid_url_skipped(crawl):
+    assert all(result["url"] != INVALID_URL for result in crawl["results"])
+
+def check_titles(crawl):
+    for result in crawl["results"]:
+        assert "Example Domain" in result["title"]
+
+def check_content(crawl):
+    for result in crawl["results"]:
+        assert "Example Domain" in result["content"]
+
+def check_text_content(crawl):
+    assert "Example Domain" in crawl["text"]
+    assert "This domain is for use in illustrative examples" in crawl["text"]
+
+@pytest.mark.selenium
+@pytest.mark.parametrize("check", [
+    check_result_count,
+    check_result_urls,
+    check_invalid_url_skipped,
+    check_titles,
+    check_content,
+    check_text_content
+])
+def test_crawl_examples(example_crawl, check):
+    """测试爬取结果、无效URL处理和文本提取"""
+    check(example_crawl)
+
+@pytest.mark.selenium
+def test_context_manager():
+    """测试上下文管理器"""
+    with WebCrawler() as crawler:
+        crawler.setup()
+        assert crawler.driver is not None
         results = crawler.crawl_urls(["https://example.com"])
-        
         assert len(results) == 1
-        result = results[0]
         
-        assert result["url"] == "https://example.com"
-        assert result["title"] == "Example Domain"
-        assert "Example Domain" in result["content"]
-        
-    finally:
-        crawler.cleanup()
+    # 退出上下文后，driver应该被清理
+    assert crawler.driver is None
+
+class FakeDriver:
+    """记录调用的伪Chrome WebDriver，不启动浏览器"""
+    title = "Fake"
+    page_source = "<html></html>"
+    
+    def __init__(self):
+        self.current_url = "about:blank"
+        self.quit_called = False
+        self.cookies_deleted = False
+        self.cdp_commands = []
+    
+    def get(self, url):
+        self.current_url = url
+    
+    def execute_script(self, script, *args):
+        return None
+    
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append((cmd, params))
+        return {}
+    
+    def delete_all_cookies(self):
+        self.cookies_deleted = True
+    
+    def quit(self):
+        self.quit_called = True
+
+class FakeFirefoxDriver(FakeDriver):
+    """伪Firefox WebDriver，与真实驱动一样带有 execute_cdp_cmd 但调用时抛出异常"""
+    
+    def execute_cdp_cmd(self, cmd, params):
+        raise RuntimeError("CDP support for Firefox has been removed")
+
+@pytest.fixture
+def fake_drivers(monkeypatch):
+    """替换 get_driver，按浏览器类型创建伪驱动，返回创建过的伪驱动列表"""
+    drivers = []
+    
+    def fake_get_driver(browser_type, headless, **kwargs):
+        drivers.append(FakeFirefoxDriver() if browser_type == "firefox" else FakeDriver())
+        return drivers[-1]
+    
+    monkeypatch.setattr(crawler_module, "get_driver", fake_get_driver)
+    monkeypatch.setattr(crawler_module, "FAST_NAVIGATION", False)
+    return drivers
 
-def test_crawl_multiple_urls():
-    """测试多个URL爬取"""
+def test_driver_recycled_after_page_limit(monkeypatch, fake_drivers):
+    """测试访问页面数达到上限后重建浏览器会话"""
+    monkeypatch.setattr(crawler_module, "DRIVER_RECYCLE_EVERY", 2)
+    
     crawler = WebCrawler()
     crawler.setup()
+    results = crawler.crawl_urls([f"https://example.com/{i}" for i in range(5)])
     
-    try:
-        # 爬取多个示例网页
-        urls = [
-            "https://example.com",
-            "https://example.org"
-        ]
-        results = crawler.crawl_urls(urls)
-        
-        assert len(results) == 2
-        
-        for result, url in zip(results, urls):
-            assert result["url"] == url
-            assert "Example Domain" in result["title"]
-            assert "Example Domain" in result["content"]
-            
-    finally:
-        crawler.cleanup()
+    assert len(results) == 5
+    assert len(fake_drivers) == 3
+    assert fake_drivers[0].quit_called and fake_drivers[1].quit_called
+    assert crawler.pages_visited == 1
 
-def test_extract_text_content():
-    """测试文本内容提取"""
+def test_recycle_failure_stops_crawl(monkeypatch, fake_drivers):
+    """测试重建浏览器会话失败时抛出异常，而不是用已关闭的驱动继续爬取"""
+    monkeypatch.setattr(crawler_module, "DRIVER_RECYCLE_EVERY", 2)
+    
     crawler = WebCrawler()
     crawler.setup()
     
-    try:
-        # 访问示例网页
-        crawler.crawl_urls(["https://example.com"])
-        
-        # 提取文本内容
-        text = crawler.extract_text_content("body")
-        
-        assert "Example Domain" in text
-        assert "This domain is for use in illustrative examples" in text
-        
-    finally:
-        crawler.cleanup()
+    def broken_get_driver(browser_type, headless, **kwargs):
+        raise RuntimeError("无法启动浏览器")
+    
+    monkeypatch.setattr(crawler_module, "get_driver", broken_get_driver)
+    results = crawler.iter_crawl([f"https://example.com/{i}" for i in range(5)])
+    
+    assert len([next(results), next(results)]) == 2
+    with pytest.raises(RuntimeError):
+        next(results)
+    assert fake_drivers[0].quit_called
+    assert crawler.driver is None
+
+def test_reset_state_clears_every_origin_via_cdp(fake_drivers):
+    """测试Chrome实例租用期间访问多个主机后，通过CDP清除所有cookie和每个来源的存储"""
+    pool = CrawlerPool(WebCrawler, size=1, timeout=0)
+    
+    with pool.lease("chrome", True) as crawler:
+        crawler.crawl_urls(["https://a.example/1", "https://b.example/2"])
+    
+    driver = fake_drivers[0]
+    assert ("Network.clearBrowserCookies", {}) in driver.cdp_commands
+    cleared = {params["origin"] for cmd, params in driver.cdp_commands if cmd == "Storage.clearDataForOrigin"}
+    assert cleared == {"https://a.example", "https://b.example"}
+    assert crawler.visited_origins == set()
+    assert pool.acquire("chrome", True) is crawler
+
+def test_reset_state_recycles_session_after_multiple_origins(fake_drivers):
+    """测试Firefox实例访问多个主机后归还时重建浏览器会话，而不是被池丢弃"""
+    pool = CrawlerPool(WebCrawler, size=1, timeout=0)
+    
+    with pool.lease("firefox", True) as crawler:
+        crawler.crawl_urls(["https://a.example/1", "https://b.example/2"])
+    
+    assert len(fake_drivers) == 2
+    assert fake_drivers[0].quit_called
+    assert crawler.driver is fake_drivers[1]
+    assert crawler.visited_origins == set()
+    assert pool.acquire("firefox", True) is crawler
+
+def test_reset_state_single_origin_keeps_session(fake_drivers):
+    """测试Firefox实例只访问过一个来源时，在原会话中清除状态"""
+    crawler = WebCrawler()
+    crawler.setup(browser_type="firefox")
+    crawler.crawl_urls(["https://a.example/1", "https://a.example/2"])
+    
+    crawler.reset_state()
+    
+    assert len(fake_drivers) == 1
+    assert fake_drivers[0].cookies_deleted
+    assert fake_drivers[0].current_url == "about:blank"
+
+def test_pool_reuses_firefox_crawler(fake_drivers):
+    """测试连续租用Firefox实例时复用同一个浏览器会话"""
+    pool = CrawlerPool(WebCrawler, size=1, timeout=0)
+    
+    for _ in range(3):
+        with pool.lease("firefox", True) as crawler:
+            crawler.crawl_urls(["https://a.example/1"])
+    
+    assert len(fake_drivers) == 1
+    assert not fake_drivers[0].quit_called
 
-def test_invalid_url():
-    """测试无效URL处理"""
+def test_fast_navigation_uses_cdp_for_chrome(monkeypatch, fake_drivers):
+    """测试启用快速导航时Chrome会话通过 Page.navigate 打开页面"""
+    monkeypatch.setattr(crawler_module, "FAST_NAVIGATION", True)
     crawler = WebCrawler()
     crawler.setup()
+    crawler.wait_for = lambda condition: True
     
-    try:
-        results = crawler.crawl_urls(["https://this-is-an-invalid-domain-123456.com"])
-        assert len(results) == 0
-    finally:
-        crawler.cleanup()
+    crawler.navigate("https://a.example/1")
+    
+    assert ("Page.navigate", {"url": "https://a.example/1"}) in fake_drivers[0].cdp_commands
+    assert fake_drivers[0].current_url == "about:blank"
 
-def test_context_manager():
-    """测试上下文管理器"""
-    with WebCrawler() as crawler:
-        assert crawler.driver is not None
-        results = crawler.crawl_urls(["https://example.com"])
-        assert len(results) == 1
-        
-    # 退出上下文后，driver应该被清理
-    assert crawler.driver is None
+def test_fast_navigation_falls_back_for_firefox(monkeypatch, fake_drivers):
+    """测试启用快速导航时Firefox会话仍使用 driver.get 成功爬取"""
+    monkeypatch.setattr(crawler_module, "FAST_NAVIGATION", True)
+    crawler = WebCrawler()
+    crawler.setup(browser_type="firefox")
+    
+    results = crawler.crawl_urls(["https://a.example/1", "https://b.example/2"])
+    
+    assert [result["url"] for result in results] == ["https://a.example/1", "https://b.example/2"]
+    assert fake_drivers[0].current_url == "https://b.example/2"
+
+def test_fast_navigation_falls_back_on_cdp_error(monkeypatch, fake_drivers):
+    """测试CDP导航抛出任意异常时改用 driver.get"""
+    monkeypatch.setattr(crawler_module, "FAST_NAVIGATION", True)
+    crawler = WebCrawler()
+    crawler.setup()
+    
+    def broken_cdp(cmd, params):
+        raise RuntimeError("CDP不可用")
+    
+    fake_drivers[0].execute_cdp_cmd = broken_cdp
+    crawler.navigate("https://a.example/1")
+    
+    assert fake_drivers[0].current_url == "https://a.example/1"
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
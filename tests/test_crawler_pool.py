@@ -0,0 +1,180 @@
+"""
+CrawlerPool 的单元测试
+"""
+
+import queue
+import threading
+import time
+
+import pytest
+
+from src.crawler_pool import CrawlerPool, PoolExhaustedError
+
+class FakeCrawler:
+    """不启动浏览器的伪爬虫"""
+
+    def __init__(self):
+        self.browser_type = None
+        self.headless = True
+        self.closed = False
+
+    def setup(self, browser_type="chrome", headless=True):
+        self.browser_type = browser_type
+        self.headless = headless
+
+    def is_alive(self):
+        return not self.closed
+
+    def reset_state(self):
+        pass
+
+    def cleanup(self):
+        self.closed = True
+
+def test_pool_reuses_released_crawler():
+    """测试归还的实例会被复用"""
+    pool = CrawlerPool(FakeCrawler, size=2, timeout=0)
+
+    crawler = pool.acquire("chrome", True)
+    pool.release(crawler)
+
+    assert pool.acquire("chrome", True) is crawler
+    assert pool.active == 1
+
+def test_pool_exhausted():
+    """测试池满时抛出异常"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=0)
+    pool.acquire("chrome", True)
+
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire("chrome", True)
+
+def test_acquire_wakes_when_other_key_released():
+    """测试等待期间其他分组归还实例时，等待者淘汰该实例并获取名额"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=5)
+    firefox = pool.acquire("firefox", True)
+    threading.Timer(0.2, pool.release, args=(firefox,)).start()
+
+    started = time.monotonic()
+    chrome = pool.acquire("chrome", True)
+
+    assert time.monotonic() - started < 2
+    assert chrome.browser_type == "chrome"
+    assert firefox.closed
+
+def test_acquire_wakes_when_crawler_discarded():
+    """测试等待期间同分组实例被丢弃时，等待者创建新实例"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=5)
+    first = pool.acquire("chrome", True)
+    threading.Timer(0.2, pool.release, args=(first,), kwargs={"discard": True}).start()
+
+    started = time.monotonic()
+    second = pool.acquire("chrome", True)
+
+    assert time.monotonic() - started < 2
+    assert second is not first
+    assert pool.active == 1
+
+def test_pool_evicts_idle_crawler_of_other_key():
+    """测试池满时淘汰其他分组的空闲实例"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=0)
+    firefox = pool.acquire("firefox", True)
+    pool.release(firefox)
+
+    chrome = pool.acquire("chrome", True)
+
+    assert firefox.closed
+    assert chrome.browser_type == "chrome"
+    assert pool.active == 1
+
+def test_lease_discards_crawler_on_error():
+    """测试借用期间发生异常时丢弃实例"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=0)
+
+    with pytest.raises(RuntimeError):
+        with pool.lease("chrome", True) as crawler:
+            raise RuntimeError("driver crashed")
+
+    assert crawler.closed
+    assert pool.active == 0
+
+def test_close_all():
+    """测试关闭所有空闲实例"""
+    pool = CrawlerPool(FakeCrawler, size=2, timeout=0)
+    crawler = pool.acquire("chrome", True)
+    pool.release(crawler)
+
+    pool.close_all()
+
+    assert crawler.closed
+    assert pool.active == 0
+
+def test_evict_idle():
+    """测试回收空闲超时的实例"""
+    pool = CrawlerPool(FakeCrawler, size=2, timeout=0)
+    crawler = pool.acquire("chrome", True)
+    pool.release(crawler)
+
+    assert pool.evict_idle(max_idle=60) == 0
+    assert pool.evict_idle(max_idle=0) == 1
+    assert crawler.closed
+    assert pool.active == 0
+
+def test_acquire_wakes_when_evict_idle_requeues():
+    """测试 evict_idle 检查期间等待的 acquire 在实例放回队列后被唤醒"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=5)
+    crawler = pool.acquire("chrome", True)
+    pool.release(crawler)
+
+    taken = threading.Event()
+    requeue = threading.Event()
+
+    class GatedQueue(queue.Queue):
+        """取出实例后通知测试，放回前等待测试放行"""
+        def get_nowait(self):
+            entry = super().get_nowait()
+            taken.set()
+            return entry
+
+        def put(self, item, *args, **kwargs):
+            requeue.wait()
+            super().put(item, *args, **kwargs)
+
+    gated = GatedQueue()
+    gated.queue.append(pool._idle[("chrome", True)].get_nowait())
+    pool._idle[("chrome", True)] = gated
+
+    threading.Thread(target=pool.evict_idle, args=(60,), daemon=True).start()
+    assert taken.wait(2)
+    taken.clear()
+    threading.Timer(0.2, requeue.set).start()
+
+    started = time.monotonic()
+    assert pool.acquire("chrome", True) is crawler
+    assert time.monotonic() - started < 2
+
+def test_release_discards_crawler_when_reset_fails():
+    """测试重置状态失败时丢弃实例"""
+    class BrokenCrawler(FakeCrawler):
+        def reset_state(self):
+            raise RuntimeError("session lost")
+
+    pool = CrawlerPool(BrokenCrawler, size=1, timeout=0)
+    crawler = pool.acquire("chrome", True)
+    pool.release(crawler)
+
+    assert crawler.closed
+    assert pool.active == 0
+
+def test_acquire_replaces_dead_crawler():
+    """测试空闲实例会话失效时创建新实例"""
+    pool = CrawlerPool(FakeCrawler, size=1, timeout=0)
+    dead = pool.acquire("chrome", True)
+    pool.release(dead)
+    dead.is_alive = lambda: False
+
+    crawler = pool.acquire("chrome", True)
+
+    assert crawler is not dead
+    assert dead.closed
+    assert pool.active == 1
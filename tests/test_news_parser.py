@@ -0,0 +1,33 @@
+"""
+NewsParser 的单元测试
+"""
+
+import pytest
+
+from src.plugins.parse.news_parser import NewsParser
+
+def test_parse_news_page():
+    """测试提取标题、正文和日期"""
+    html = ("<html><body><h1> 标题 <b>加粗</b> </h1><p> 第一段 </p><div><p>第二段</p></div>"
+            "<time datetime='2024-01-01'>1月1日</time></body></html>")
+
+    result = NewsParser().parse(html)
+
+    assert result == {"title": "标题 加粗", "content": "第一段\n第二段", "date": "2024-01-01", "type": "news"}
+
+def test_parse_xhtml_with_encoding_declaration():
+    """测试带XML编码声明的XHTML页面"""
+    html = ('<?xml version="1.0" encoding="utf-8"?>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml"><body><h1>新闻</h1><p>内容</p></body></html>')
+
+    result = NewsParser().parse(html)
+
+    assert result["title"] == "新闻"
+    assert result["content"] == "内容"
+
+@pytest.mark.parametrize("html", ["", "   ", "<!-- empty -->"])
+def test_parse_empty_document(html):
+    """测试空文档返回空字段"""
+    result = NewsParser().parse(html)
+
+    assert result == {"title": "", "content": "", "date": "", "type": "news"}
@@ -0,0 +1,64 @@
+"""
+ResultCache 的单元测试
+"""
+
+import time
+
+from src.result_cache import ResultCache
+
+def test_cache_hit_and_miss():
+    """测试缓存命中与未命中"""
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+def test_cache_evicts_least_recently_used():
+    """测试超出容量时淘汰最久未使用的条目"""
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_cache_expires_entries():
+    """测试条目过期"""
+    cache = ResultCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_cache_disabled():
+    """测试容量为0时禁用缓存"""
+    cache = ResultCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+def test_cache_evicts_by_total_bytes():
+    """测试内容总字节数超出上限时淘汰最久未使用的条目"""
+    page = "x" * 1000
+    cache = ResultCache(maxsize=10, ttl=60, max_bytes=2500)
+    cache.set("a", {"url": "a", "content": page})
+    cache.set("b", {"url": "b", "content": page})
+    cache.set("c", {"url": "c", "content": page})
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+
+def test_cache_skips_oversized_value():
+    """测试单个值超过字节数上限时不缓存，且替换已有的同键条目"""
+    cache = ResultCache(maxsize=10, ttl=60, max_bytes=500)
+    cache.set("a", {"content": "small"})
+    cache.set("a", {"content": "x" * 1000})
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,69 @@
+"""
+工具函数的单元测试
+"""
+
+import pytest
+
+from src import utils
+from src.utils import retry_on_exception
+
+def test_retry_until_success():
+    """测试失败后重试直到成功"""
+    calls = []
+
+    @retry_on_exception(exceptions=(ValueError,), retries=3, base_delay=0)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError("temporary")
+        return "ok"
+
+    assert flaky() == "ok"
+    assert len(calls) == 3
+
+def test_retry_gives_up_after_max_retries():
+    """测试超过重试次数后抛出最后一次的异常"""
+    calls = []
+
+    @retry_on_exception(exceptions=(ValueError,), retries=2, base_delay=0)
+    def broken():
+        calls.append(1)
+        raise ValueError("permanent")
+
+    with pytest.raises(ValueError):
+        broken()
+    assert len(calls) == 3
+
+def test_retry_ignores_other_exceptions():
+    """测试非指定类型的异常不重试"""
+    calls = []
+
+    @retry_on_exception(exceptions=(ValueError,), retries=2, base_delay=0)
+    def broken():
+        calls.append(1)
+        raise KeyError("other")
+
+    with pytest.raises(KeyError):
+        broken()
+    assert len(calls) == 1
+
+def test_no_retries_returns_original_function():
+    """测试不重试时直接返回原函数"""
+    def func():
+        return "ok"
+
+    assert retry_on_exception(retries=0)(func) is func
+
+def test_retry_delay_capped_after_jitter(monkeypatch):
+    """测试加入抖动后的等待时间仍不超过 max_delay"""
+    delays = []
+    monkeypatch.setattr(utils.random, "uniform", lambda a, b: b)
+    monkeypatch.setattr(utils.time, "sleep", delays.append)
+
+    @retry_on_exception(exceptions=(ValueError,), retries=4, base_delay=1, max_delay=4)
+    def broken():
+        raise ValueError("permanent")
+
+    with pytest.raises(ValueError):
+        broken()
+    assert delays == [1.5, 3.0, 4, 4]